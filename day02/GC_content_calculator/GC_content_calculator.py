@@ -1,86 +1,904 @@
+import argparse
+import glob
+import gzip
+import json
+import logging
+import mmap
 import sys
 import os
+import zlib
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+# Diagnostics go through this logger; it is silent unless main() (or the caller) configures logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+VALID_CHARS = set('ATCG')
+CHUNK_SIZE = 1 << 20  # characters read from the file at a time
+SPLIT_SIZE = 64 << 20  # bytes of sequence handed to one worker task
+_WHITESPACE = str.maketrans('', '', ' \t\r\n')
+_WHITESPACE_CODES = np.frombuffer(b' \t\r\n', dtype=np.uint8)
+COMPOSITION_KEYS = ('A', 'C', 'G', 'T', 'N', 'other')
+# 1 for G/C bytes, 0 for everything else; indexing it with sequence codes gives the GC indicator array
+_GC_INDICATOR = np.zeros(256, dtype=np.int64)
+_GC_INDICATOR[np.frombuffer(b'GCgc', dtype=np.uint8)] = 1
+# rows: counted (non-whitespace) bytes, G/C bytes, invalid (counted but not ACGT) bytes;
+# one matrix product with a byte histogram gives GCCounter.counts()
+_COUNT_WEIGHTS = np.zeros((3, 256), dtype=np.int64)
+_COUNT_WEIGHTS[0] = 1
+_COUNT_WEIGHTS[0, _WHITESPACE_CODES] = 0
+_COUNT_WEIGHTS[1] = _GC_INDICATOR
+_COUNT_WEIGHTS[2] = _COUNT_WEIGHTS[0]
+_COUNT_WEIGHTS[2, np.frombuffer(b'ACGTacgt', dtype=np.uint8)] = 0
+# 2-bit base codes for k-mer counting: A=0, C=1, G=2, T=3; 4 marks anything else
+_BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _bases in enumerate((b'Aa', b'Cc', b'Gg', b'Tt')):
+    _BASE_CODES[np.frombuffer(_bases, dtype=np.uint8)] = _code
+MAX_K = 12  # 4**12 counters (128 MB) is the largest dense spectrum we allow
+
+def byte_histogram(data, window=CHUNK_SIZE):
+    """Return the counts of all 256 byte values in data (str, bytes, mmap or uint8 array).
+
+    The data is viewed as a numpy.uint8 array without copying and counted with
+    bincount, window by window to keep bincount's temporary arrays small.
+    """
+    if isinstance(data, str):
+        data = data.encode('latin-1', 'replace')
+    codes = data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.uint8)
+    counts = np.zeros(256, dtype=np.int64)
+    for pos in range(0, len(codes), window):
+        counts += np.bincount(codes[pos:pos + window], minlength=256)
+    return counts
+
+def composition_from_histogram(counts):
+    """Return {A, C, G, T, N, other: count} from a 256-entry byte histogram.
+
+    Upper and lower case are merged and whitespace is not counted.
+    """
+    total = int(counts.sum() - counts[_WHITESPACE_CODES].sum())
+    counts = counts.tolist()  # plain ints index much faster than numpy scalars
+    composition = {}
+    for base in 'ACGTN':
+        composition[base] = counts[ord(base)] + counts[ord(base.lower())]
+    composition['other'] = total - sum(composition.values())
+    return composition
+
+def base_composition(sequence):
+    """Return the A/C/G/T/N/other counts of a DNA sequence."""
+    return composition_from_histogram(byte_histogram(sequence))
 
 def calculate_gc_content(sequence):
     """Calculate the GC content of a DNA sequence as a percentage."""
-    sequence = sequence.upper()  # Convert to uppercase to handle both cases
-    total_bases = len(sequence)
-    if total_bases == 0:
-        print("Warning: Empty sequence")
-        return 0.0
-    gc_count = sequence.count('G') + sequence.count('C')
-    return (gc_count / total_bases) * 100
+    counter = GCCounter()
+    counter.update(sequence)
+    return counter.gc_content()
 
 def validate_sequence(sequence):
     """Validate that the sequence contains only valid DNA characters."""
-    valid_chars = set('ATCG')
-    sequence = sequence.upper()
-    invalid_chars = set(sequence) - valid_chars
-    if invalid_chars:
-        print(f"Warning: Found invalid characters in sequence: {invalid_chars}")
+    counter = GCCounter()
+    counter.update(sequence)
+    if counter.invalid_chars:
+        logger.warning("Found invalid characters in sequence: %s", counter.invalid_chars)
         return False
     return True
 
-def read_fasta_file(filename):
-    """Read a FASTA file and return the DNA sequence, ignoring header lines."""
-    sequence = ""
+class GCCounter:
+    """Accumulate base counts over sequence chunks as a 256-entry byte histogram."""
+
+    def __init__(self):
+        self.byte_counts = np.zeros(256, dtype=np.int64)
+
+    def update(self, chunk):
+        """Add the bases of one sequence chunk (str or bytes-like) to the running counts."""
+        self.byte_counts += byte_histogram(chunk)
+
+    # raw bytes, mmap windows and str chunks all go through the same histogram
+    update_bytes = update
+
+    def merge(self, other):
+        """Add the counts of another GCCounter to this one."""
+        self.byte_counts += other.byte_counts
+
+    def composition(self):
+        """Return the A/C/G/T/N/other counts seen so far."""
+        return composition_from_histogram(self.byte_counts)
+
+    def counts(self):
+        """Return (total bases, G/C count, invalid count) from a single pass over the histogram."""
+        total, gc_count, invalid = (_COUNT_WEIGHTS @ self.byte_counts).tolist()
+        return total, gc_count, invalid
+
+    @property
+    def total_bases(self):
+        return self.counts()[0]
+
+    @property
+    def gc_count(self):
+        return self.counts()[1]
+
+    @property
+    def invalid_count(self):
+        return self.counts()[2]
+
+    @property
+    def invalid_chars(self):
+        invalid = set()
+        for code in np.flatnonzero(self.byte_counts):
+            char = chr(code).upper()
+            if char not in VALID_CHARS and code not in _WHITESPACE_CODES:
+                invalid.add(char)
+        return invalid
+
+    def gc_content(self):
+        """Return the GC content of everything counted so far as a percentage."""
+        total_bases, gc_count, _ = self.counts()
+        if total_bases == 0:
+            logger.warning("Empty sequence")
+            return 0.0
+        return (gc_count / total_bases) * 100
+
+def _check_fasta_path(filename):
+    """Return the absolute path of filename, exiting if it does not exist."""
+    abs_path = os.path.abspath(filename)
+    if not os.path.exists(abs_path):
+        logger.error("File '%s' does not exist.", abs_path)
+        sys.exit(1)
+    return abs_path
+
+def fasta_compression(path):
+    """Return 'bgzf', 'gzip' or None depending on how the file at path is compressed."""
+    with open(path, 'rb') as file:
+        header = file.read(16)
+    if header[:2] != b'\x1f\x8b':
+        return None
+    # BGZF is gzip with FEXTRA set and a 'BC' subfield holding the block size
+    if len(header) >= 14 and header[3] & 4 and header[12:14] == b'BC':
+        return 'bgzf'
+    return 'gzip'
+
+def _bgzf_raw_blocks(file):
+    """Yield the raw deflate data of every block of a BGZF file."""
+    while True:
+        header = file.read(12)
+        if not header:
+            return
+        if len(header) < 12 or header[:4] != b'\x1f\x8b\x08\x04':
+            raise ValueError("invalid BGZF block header")
+        xlen = int.from_bytes(header[10:12], 'little')
+        extra = file.read(xlen)
+        block_size = None
+        pos = 0
+        while pos + 4 <= len(extra):
+            field_length = int.from_bytes(extra[pos + 2:pos + 4], 'little')
+            if extra[pos:pos + 2] == b'BC' and field_length == 2:
+                block_size = int.from_bytes(extra[pos + 4:pos + 6], 'little') + 1
+            pos += 4 + field_length
+        if block_size is None:
+            raise ValueError("BGZF block without a BC subfield")
+        rest = file.read(block_size - 12 - xlen)
+        yield rest[:-8]  # drop the CRC32 and ISIZE trailer
+
+def read_bgzf_blocks(path, workers=None):
+    """Yield the decompressed data of a BGZF file block by block, in order.
+
+    Blocks are inflated on a pool of worker threads (zlib releases the GIL)
+    with a bounded number of blocks in flight, so memory use stays flat.
+    """
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+    with open(path, 'rb') as file, ThreadPoolExecutor(max_workers=workers) as executor:
+        for data in _bgzf_raw_blocks(file):
+            pending.append(executor.submit(zlib.decompress, data, -15))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _read_text_blocks(path, chunk_size):
+    """Yield the text of a plain, gzip or BGZF compressed file in blocks."""
+    compression = fasta_compression(path)
+    if compression == 'bgzf':
+        for data in read_bgzf_blocks(path):
+            if data:
+                yield data.decode('latin-1')
+        return
+    with (gzip.open(path, 'rt') if compression == 'gzip' else open(path, 'r')) as file:
+        while True:
+            block = file.read(chunk_size)
+            if not block:
+                return
+            yield block
+
+def read_fasta_records(filename, chunk_size=CHUNK_SIZE):
+    """Yield (header, chunk) pairs for every record of a FASTA file.
+
+    Each record starts with a (header, '') pair, followed by one pair per
+    sequence chunk. Headers are returned without the leading '>'; sequence
+    found before the first header is reported with header None. The file is
+    read in blocks of chunk_size characters, so memory use stays flat no
+    matter how large the file (or a single unwrapped line) is. gzip and BGZF
+    compressed files are decompressed on the fly.
+    """
+    abs_path = _check_fasta_path(filename)
+    logger.debug("Reading %s", abs_path)
     try:
-        # Print absolute path for debugging
-        abs_path = os.path.abspath(filename)        
-        if not os.path.exists(abs_path):
-            print(f"Error: File '{abs_path}' does not exist.")
-            sys.exit(1)
-            
-        with open(abs_path, 'r') as file:
-            print("File opened successfully")
-            print(file)
-            line_count = 0
-            for line in file:
-                line_count += 1
-                line = line.strip()
-                if not line:  # Skip empty lines
+        header = None
+        header_parts = None  # collects the header line while it is being read
+        at_line_start = True
+        for block in _read_text_blocks(abs_path, chunk_size):
+            pieces = []
+            pos = 0
+            end = len(block)
+            while pos < end:
+                if header_parts is not None:
+                    newline = block.find('\n', pos)
+                    if newline == -1:
+                        header_parts.append(block[pos:])
+                        pos = end
+                        continue
+                    header_parts.append(block[pos:newline])
+                    header = ''.join(header_parts)[1:].strip()
+                    logger.debug("Found header line: %s", header)
+                    header_parts = None
+                    at_line_start = True
+                    pos = newline + 1
+                    yield header, ''
                     continue
-                if line.startswith('>'):
-                    print(f"Found header line: {line}")
+                if at_line_start and block[pos] == '>':
+                    chunk = ''.join(pieces).translate(_WHITESPACE)
+                    if chunk:
+                        yield header, chunk
+                    pieces = []
+                    header_parts = []
                     continue
-                sequence += line
-                
-            print(f"Read {line_count} lines")
-            if not sequence:
-                print("Warning: No sequence data found in file")
-                
-        return sequence
-        
-    except FileNotFoundError:
-        print(f"Error: File '{filename}' not found.")
-        sys.exit(1)
+                next_header = block.find('\n>', pos)
+                if next_header == -1:
+                    pieces.append(block[pos:])
+                    at_line_start = block.endswith('\n')
+                    pos = end
+                else:
+                    pieces.append(block[pos:next_header])
+                    at_line_start = True
+                    pos = next_header + 1
+            chunk = ''.join(pieces).translate(_WHITESPACE)
+            if chunk:
+                yield header, chunk
+        if header_parts is not None:  # header on the last line without a newline
+            yield ''.join(header_parts)[1:].strip(), ''
     except Exception as e:
-        print(f"Error reading file: {str(e)}")
+        logger.error("Error reading file: %s", e)
         sys.exit(1)
 
+def read_fasta_chunks(filename, chunk_size=CHUNK_SIZE):
+    """Yield the DNA sequence of a FASTA file in chunks, ignoring header lines."""
+    for _, chunk in read_fasta_records(filename, chunk_size):
+        if chunk:
+            yield chunk
+
+def record_name(header):
+    """Return the sequence name of a FASTA header (its first word)."""
+    if not header:
+        return ''
+    return header.split()[0]
+
+def gc_report(filename, chunk_size=CHUNK_SIZE):
+    """Yield (header, GCCounter) for every record of a FASTA file in one pass."""
+    counter = None
+    header = None
+    for record_header, chunk in read_fasta_records(filename, chunk_size):
+        if counter is None or not chunk:  # a (header, "") pair starts a new record
+            if counter is not None:
+                yield header, counter
+            header = record_header
+            counter = GCCounter()
+        counter.update(chunk)
+    if counter is not None:
+        yield header, counter
+
+def fasta_record_spans(buffer):
+    """Yield (header, start, end) for every record of a FASTA file held in a bytes-like buffer.
+
+    start and end are the byte offsets of the record's sequence lines (newlines
+    included). Sequence found before the first header is reported with header None.
+    """
+    size = len(buffer)
+    header = None
+    start = 0
+    marker = 0 if buffer[:1] == b'>' else buffer.find(b'\n>')
+    while True:
+        end = size if marker == -1 else max(marker, start)
+        if header is not None or end > start:
+            yield header, start, end
+        if marker == -1:
+            return
+        if buffer[marker:marker + 1] == b'\n':
+            marker += 1
+        newline = buffer.find(b'\n', marker)
+        if newline == -1:
+            newline = size
+        header = buffer[marker + 1:newline].decode('ascii', 'replace').strip()
+        start = min(newline + 1, size)
+        marker = buffer.find(b'\n>', newline)
+
+def _span_histogram(buffer, start, end, window):
+    """Return the byte histogram of buffer[start:end] without copying it out of the buffer."""
+    if end <= start:
+        return np.zeros(256, dtype=np.int64)
+    codes = np.frombuffer(buffer, dtype=np.uint8, count=end - start, offset=start)
+    return byte_histogram(codes, window)
+
+def gc_report_mmap(filename, window=CHUNK_SIZE):
+    """Yield (header, GCCounter) for every record, counting bytes directly on a memory map.
+
+    The mapped bytes are viewed as a numpy array and counted in place, and
+    header lines are skipped by offset instead of being read. Compressed
+    files cannot be mapped and are streamed through gc_report instead.
+    """
+    abs_path = _check_fasta_path(filename)
+    if fasta_compression(abs_path):
+        yield from gc_report(abs_path, window)
+        return
+    with open(abs_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for header, start, end in fasta_record_spans(buffer):
+                counter = GCCounter()
+                counter.byte_counts += _span_histogram(buffer, start, end, window)
+                if header is not None or counter.total_bases:
+                    yield header, counter
+
+def count_fasta_mmap(filename, window=CHUNK_SIZE):
+    """Return a GCCounter over all records of a FASTA file using the mmap engine."""
+    total = GCCounter()
+    for _, counter in gc_report_mmap(filename, window):
+        total.merge(counter)
+    return total
+
+# One line of a samtools .fai index
+FaiEntry = namedtuple('FaiEntry', 'name length offset linebases linewidth')
+
+def _index_record(buffer, name, start, end, window=CHUNK_SIZE):
+    """Return the FaiEntry of one record whose sequence lines span buffer[start:end]."""
+    first_newline = buffer.find(b'\n', start, end)
+    while end > start and buffer[end - 1:end] in (b'\n', b'\r', b' ', b'\t'):
+        end -= 1  # ignore the final newline and trailing blank lines
+    if end == start:
+        return FaiEntry(name, 0, start, 0, 0)
+    if first_newline == -1:
+        return FaiEntry(name, end - start, start, end - start, end - start)
+    linewidth = first_newline - start + 1
+    linebases = linewidth - (2 if buffer[first_newline - 1:first_newline] == b'\r' else 1)
+    # every newline must end a full line: found at linewidth - 1, 2 * linewidth - 1, ...
+    line_count = 0
+    last_newline = -1
+    for pos in range(start, end, window):
+        codes = np.frombuffer(buffer, dtype=np.uint8, count=min(window, end - pos), offset=pos)
+        newlines = np.flatnonzero(codes == 10) + (pos - start)
+        del codes
+        if len(newlines):
+            if np.any(newlines % linewidth != linewidth - 1):
+                raise ValueError(f"different line lengths in sequence '{name}'")
+            line_count += len(newlines)
+            last_newline = int(newlines[-1])
+    if (last_newline + 1) != line_count * linewidth:
+        raise ValueError(f"different line lengths in sequence '{name}'")
+    last_line = end - start - line_count * linewidth
+    if last_line > linebases:
+        raise ValueError(f"different line lengths in sequence '{name}'")
+    return FaiEntry(name, line_count * linebases + last_line, start, linebases, linewidth)
+
+def build_fasta_index(filename, fai_path=None):
+    """Write a samtools-compatible .fai index for a plain FASTA file and return its entries.
+
+    Each line holds NAME, LENGTH, OFFSET (of the first base), LINEBASES and
+    LINEWIDTH, which is all that is needed to seek to any base. Raises
+    ValueError for compressed files and records with uneven line lengths.
+    """
+    abs_path = _check_fasta_path(filename)
+    if fasta_compression(abs_path):
+        raise ValueError("a .fai index can only be built for an uncompressed FASTA file")
+    entries = []
+    with open(abs_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for header, start, end in fasta_record_spans(buffer):
+                    if header is None:
+                        raise ValueError("sequence found before the first header")
+                    entries.append(_index_record(buffer, record_name(header), start, end))
+    with open(fai_path or abs_path + '.fai', 'w') as fai:
+        for entry in entries:
+            fai.write('\t'.join(str(field) for field in entry) + '\n')
+    return entries
+
+def load_fasta_index(filename):
+    """Return {name: FaiEntry} for a FASTA file, (re)building its .fai if missing or stale."""
+    abs_path = _check_fasta_path(filename)
+    fai_path = abs_path + '.fai'
+    if not os.path.exists(fai_path) or os.path.getmtime(fai_path) < os.path.getmtime(abs_path):
+        entries = build_fasta_index(abs_path, fai_path)
+    else:
+        entries = []
+        with open(fai_path) as fai:
+            for line in fai:
+                fields = line.rstrip('\n').split('\t')
+                entries.append(FaiEntry(fields[0], *(int(field) for field in fields[1:5])))
+    return {entry.name: entry for entry in entries}
+
+def parse_region(region):
+    """Parse 'chr7:1,000,000-2,000,000' into (name, start, end), 0-based and end exclusive.
+
+    The positions are 1-based and inclusive as in samtools; a missing start or
+    end means the beginning or end of the sequence (end is then None).
+    """
+    name, _, span = region.rpartition(':')
+    if not name:
+        return region, 0, None
+    span = span.replace(',', '')
+    first, _, last = span.partition('-')
+    start = int(first) - 1 if first else 0
+    end = int(last) if last else None
+    if start < 0 or (end is not None and end < start):
+        raise ValueError(f"invalid region '{region}'")
+    return name, start, end
+
+def _split_region(region, index):
+    """Return (name, start, end) of a region like parse_region, but, as in samtools,
+    a region that is a whole sequence name of the index (e.g. 'HLA-A*01:01:01:01') is that sequence."""
+    if region in index:
+        return region, 0, None
+    return parse_region(region)
+
+def _base_offset(entry, position):
+    """Return the byte offset of the base at 0-based position of an indexed record."""
+    if entry.linebases == 0:
+        return entry.offset
+    return entry.offset + (position // entry.linebases) * entry.linewidth + position % entry.linebases
+
+def region_gc(filename, region, index=None):
+    """Return a GCCounter for one region, e.g. 'chr7:1,000,000-2,000,000'.
+
+    The .fai index gives the byte offset of the region, so only its bytes
+    are read from the memory-mapped file.
+    """
+    index = index if index is not None else load_fasta_index(filename)
+    name, start, end = _split_region(region, index)
+    if name not in index:
+        raise ValueError(f"sequence '{name}' not found in the index")
+    entry = index[name]
+    end = entry.length if end is None else min(end, entry.length)
+    counter = GCCounter()
+    if start >= end:
+        return counter
+    byte_start = _base_offset(entry, start)
+    byte_end = _base_offset(entry, end - 1) + 1
+    with open(_check_fasta_path(filename), 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            counter.byte_counts += _span_histogram(buffer, byte_start, byte_end, CHUNK_SIZE)
+    return counter
+
+def region_rows(filename, regions):
+    """Yield a result row (region, length, gc_percent, invalid_bases) for every region.
+
+    A region whose sequence is not in the file is logged and skipped, so a
+    batch of files that do not all hold every sequence still runs to the end.
+    """
+    index = load_fasta_index(filename)
+    for region in regions:
+        name = _split_region(region, index)[0]
+        if name not in index:
+            logger.error("sequence '%s' not found in %s, skipped", name, filename)
+            continue
+        yield _counter_row({'region': region}, region_gc(filename, region, index))
+
+def expand_fasta_paths(patterns):
+    """Expand glob patterns into a list of FASTA paths, keeping the command-line order.
+
+    Patterns that match nothing are kept as they are, so the missing file is reported later.
+    """
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        paths.extend(matches if matches else [pattern])
+    return paths
+
+def _plan_tasks(paths, split_size, per_record):
+    """Split FASTA files into worker tasks of about split_size bytes of sequence each.
+
+    Returns (headers, tasks): headers[i] lists the record headers of paths[i],
+    and every task is (path, file index, [(key, start, end), ...]) where key
+    is (file index, record index), or (file index, 0) when per-record counts
+    are not needed. Large records are split across several tasks. Compressed
+    files cannot be split; they become a single task with ranges None and
+    their headers are filled in by the worker.
+    """
+    headers = []
+    tasks = []
+    for file_index, path in enumerate(paths):
+        abs_path = _check_fasta_path(path)
+        file_headers = []
+        headers.append(file_headers)
+        ranges = []
+        budget = 0
+        if fasta_compression(abs_path):
+            tasks.append((abs_path, file_index, None))
+            continue
+        with open(abs_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                continue
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for record_index, (header, start, end) in enumerate(fasta_record_spans(buffer)):
+                    file_headers.append(header)
+                    key = (file_index, record_index if per_record else 0)
+                    pos = start
+                    while pos < end:
+                        piece_end = min(end, pos + split_size - budget)
+                        ranges.append((key, pos, piece_end))
+                        budget += piece_end - pos
+                        pos = piece_end
+                        if budget >= split_size:
+                            tasks.append((abs_path, file_index, ranges))
+                            ranges = []
+                            budget = 0
+        if ranges:
+            tasks.append((abs_path, file_index, ranges))
+        logger.debug("%s: %d records", abs_path, len(file_headers))
+    logger.info("Counting %d files in %d tasks", len(paths), len(tasks))
+    return headers, tasks
+
+def _count_ranges(task, per_record=True):
+    """Worker: return (file index, headers, [(key, byte histogram)]) for one task.
+
+    headers is None for mapped byte ranges and the list of record headers
+    when a compressed file had to be streamed.
+    """
+    path, file_index, ranges = task
+    histograms = {}
+    if ranges is None:
+        headers = []
+        for record_index, (header, counter) in enumerate(gc_report(path)):
+            headers.append(header)
+            key = (file_index, record_index if per_record else 0)
+            if key in histograms:
+                histograms[key] += counter.byte_counts
+            else:
+                histograms[key] = counter.byte_counts
+        return file_index, headers, list(histograms.items())
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        for key, start, end in ranges:
+            histogram = _span_histogram(buffer, start, end, CHUNK_SIZE)
+            if key in histograms:
+                histograms[key] += histogram
+            else:
+                histograms[key] = histogram
+    return file_index, None, list(histograms.items())
+
+def parallel_gc_report(paths, workers=None, per_record=True, split_size=SPLIT_SIZE):
+    """Count many FASTA files, spreading records and byte ranges over a process pool.
+
+    Returns one entry per path: a list of (header, GCCounter) per record when
+    per_record is true, otherwise a single GCCounter for the whole file.
+    """
+    headers, tasks = _plan_tasks(paths, split_size, per_record)
+    counters = {}
+
+    def merge(results):
+        for file_index, streamed_headers, result in results:
+            if streamed_headers is not None:
+                headers[file_index] = streamed_headers
+            for key, histogram in result:
+                counters.setdefault(key, GCCounter()).byte_counts += histogram
+
+    per_record_flags = [per_record] * len(tasks)
+    if workers == 1 or len(tasks) <= 1:
+        merge(map(_count_ranges, tasks, per_record_flags))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+            merge(executor.map(_count_ranges, tasks, per_record_flags, chunksize=chunksize))
+
+    report = []
+    for file_index, file_headers in enumerate(headers):
+        if not per_record:
+            report.append(counters.get((file_index, 0), GCCounter()))
+            continue
+        records = []
+        for record_index, header in enumerate(file_headers):
+            counter = counters.get((file_index, record_index), GCCounter())
+            if header is not None or counter.total_bases:
+                records.append((header, counter))
+        report.append(records)
+    return report
+
+def _sequence_codes(chunk):
+    """Return a sequence chunk as a numpy.uint8 array of byte codes."""
+    return np.frombuffer(chunk.encode('latin-1', 'replace'), dtype=np.uint8)
+
+def gc_windows(filename, window=1000, step=100, chunk_size=CHUNK_SIZE):
+    """Yield (name, start, end, gc_percent) for sliding windows along every record.
+
+    Windows are 0-based, half-open and start every step bases; only full
+    windows are reported. Each chunk is turned into a prefix sum of a GC
+    indicator array, so every window costs O(1). Only the bases still needed
+    by upcoming windows are carried over between chunks, so memory stays at
+    O(chunk_size + window) however long the record is.
+    """
+    if window <= 0 or step <= 0:
+        raise ValueError("window and step must be positive")
+    name = None
+    carry = None
+    for header, chunk in read_fasta_records(filename, chunk_size):
+        if carry is None or not chunk:  # a (header, "") pair starts a new record
+            name = record_name(header)
+            carry = np.zeros(0, dtype=np.int64)
+            offset = 0  # record position of carry[0]
+            next_start = 0
+        if not chunk:
+            continue
+        indicator = np.concatenate((carry, _GC_INDICATOR[_sequence_codes(chunk)]))
+        prefix = np.concatenate(([0], np.cumsum(indicator)))
+        seen = offset + len(indicator)
+        if next_start + window <= seen:
+            starts = np.arange(next_start, seen - window + 1, step)
+            local = starts - offset
+            gc_counts = prefix[local + window] - prefix[local]
+            for start, gc_count in zip(starts.tolist(), gc_counts.tolist()):
+                yield name, start, start + window, gc_count / window * 100
+            next_start = int(starts[-1]) + step
+        carry = indicator[min(next_start - offset, len(indicator)):]
+        offset = seen - len(carry)
+
+class KmerCounter:
+    """Count the k-mers of a stream of sequence chunks in a dense NumPy array.
+
+    Bases are encoded as 2-bit integers, so every k-mer is an index into an
+    array of 4**k counters instead of a string key in a dict. k-mers that
+    contain anything other than A/C/G/T are skipped. The last k - 1 bases of
+    each chunk are carried over so k-mers spanning chunks are counted; call
+    new_record() at record boundaries so they do not span records.
+    """
+
+    def __init__(self, k):
+        if not 1 <= k <= MAX_K:
+            raise ValueError(f"k must be between 1 and {MAX_K}")
+        self.k = k
+        self.counts = np.zeros(4 ** k, dtype=np.int64)
+        self._carry = np.zeros(0, dtype=np.uint8)
+
+    def new_record(self):
+        """Start a new sequence: forget the bases carried over from the previous chunk."""
+        self._carry = np.zeros(0, dtype=np.uint8)
+
+    def update(self, chunk):
+        """Add the k-mers of one sequence chunk (str)."""
+        k = self.k
+        codes = np.concatenate((self._carry, _BASE_CODES[_sequence_codes(chunk)]))
+        self._carry = codes[len(codes) - k + 1:] if k > 1 else codes[:0]
+        n = len(codes) - k + 1
+        if n <= 0:
+            return
+        # a window is valid when it holds no invalid base: prefix sums make that O(1) per window
+        invalid = np.concatenate(([0], np.cumsum(codes == 4)))
+        valid = invalid[k:] == invalid[:-k]
+        # rolling 2-bit hash, computed for all windows at once: index = sum(code[i + j] << 2 * (k - 1 - j))
+        index = np.zeros(n, dtype=np.int64)
+        for j in range(k):
+            index = (index << 2) | codes[j:j + n]
+        index = index[valid]
+        if len(index) * 4 >= len(self.counts):
+            self.counts += np.bincount(index, minlength=len(self.counts))
+        else:
+            kmers, counts = np.unique(index, return_counts=True)
+            self.counts[kmers] += counts
+
+    def merge(self, other):
+        """Add the counts of another KmerCounter with the same k."""
+        self.counts += other.counts
+
+    def kmer_string(self, index):
+        """Return the k-mer (e.g. 'ACG') stored at an index of counts."""
+        return ''.join('ACGT'[(int(index) >> 2 * (self.k - 1 - j)) & 3] for j in range(self.k))
+
+    def spectrum(self):
+        """Yield (kmer, count) for every k-mer that was seen, in lexicographic order."""
+        for index in np.flatnonzero(self.counts):
+            yield self.kmer_string(index), int(self.counts[index])
+
+def kmer_spectrum(filename, k, chunk_size=CHUNK_SIZE):
+    """Return a KmerCounter over all records of a FASTA file, streaming it chunk by chunk."""
+    counter = KmerCounter(k)
+    for _, chunk in read_fasta_records(filename, chunk_size):
+        if chunk:
+            counter.update(chunk)
+        else:
+            counter.new_record()
+    return counter
+
+def cpg_observed_expected(cpg_count, c_count, g_count, length):
+    """Return the CpG observed/expected ratio CpG * length / (C * G), or 0.0 without C or G."""
+    if not c_count or not g_count:
+        return 0.0
+    return cpg_count * length / (c_count * g_count)
+
+def cpg_rows(filename, chunk_size=CHUNK_SIZE):
+    """Yield a row per record with its length, GC content, CpG count and CpG observed/expected ratio.
+
+    Base composition and dinucleotide counts are collected in the same pass.
+    """
+    def row(header, bases, dinucleotides):
+        composition = bases.composition()
+        length = sum(composition.values())
+        cpg_count = int(dinucleotides.counts[1 * 4 + 2])  # C=1, G=2
+        return {'name': record_name(header), 'length': length,
+                'gc_percent': _gc_percent(bases), 'cpg_count': cpg_count,
+                'cpg_o_e': cpg_observed_expected(cpg_count, composition['C'], composition['G'], length)}
+
+    bases = None
+    header = None
+    for record_header, chunk in read_fasta_records(filename, chunk_size):
+        if bases is None or not chunk:  # a (header, "") pair starts a new record
+            if bases is not None:
+                yield row(header, bases, dinucleotides)
+            header = record_header
+            bases = GCCounter()
+            dinucleotides = KmerCounter(2)
+        bases.update(chunk)
+        dinucleotides.update(chunk)
+    if bases is not None:
+        yield row(header, bases, dinucleotides)
+
+def kmer_rows(filename, k):
+    """Yield a (kmer, count) row for every k-mer seen in a FASTA file."""
+    for kmer, count in kmer_spectrum(filename, k).spectrum():
+        yield {'kmer': kmer, 'count': count}
+
+def file_rows(paths, rows_of):
+    """Yield the rows of rows_of(path) for every path; a file column is added when there are several files."""
+    with_file = len(paths) > 1
+    for path in paths:
+        for row in rows_of(path):
+            yield {'file': path, **row} if with_file else row
+
+def window_rows(filename, window=1000, step=100):
+    """Yield a result row (name, start, end, gc_percent) for every sliding window."""
+    for name, start, end, gc_percent in gc_windows(filename, window, step):
+        yield {'name': name, 'start': start, 'end': end, 'gc_percent': gc_percent}
+
+def _gc_percent(counter):
+    return counter.gc_content() if counter.total_bases else 0.0
+
+def _counter_row(row, counter):
+    """Add the length, GC content and invalid base count of counter to a result row."""
+    total, gc_count, invalid = counter.counts()
+    row['length'] = total
+    row['gc_percent'] = gc_count / total * 100 if total else 0.0
+    row['invalid_bases'] = invalid
+    return row
+
+def gc_report_rows(paths, workers=None):
+    """Yield a result row per record; a file column is added when there are several files."""
+    with_file = len(paths) > 1
+    for path, records in zip(paths, parallel_gc_report(paths, workers)):
+        for header, counter in records:
+            row = {'file': path} if with_file else {}
+            row['name'] = record_name(header)
+            yield _counter_row(row, counter)
+
+def gc_summary_rows(paths, workers=None):
+    """Yield a result row per file, followed by a 'total' row."""
+    total = GCCounter()
+    for path, counter in zip(paths, parallel_gc_report(paths, workers, per_record=False)):
+        total.merge(counter)
+        yield _counter_row({'file': path}, counter)
+    yield _counter_row({'file': 'total'}, total)
+
+def write_rows(rows, output_format='tsv', out=None, header=True):
+    """Stream result rows to out as TSV (with a header line unless header is false) or JSON lines."""
+    out = out or sys.stdout
+    for index, row in enumerate(rows):
+        if output_format == 'jsonl':
+            out.write(json.dumps({key: round(value, 4) if isinstance(value, float) else value
+                                  for key, value in row.items()}) + '\n')
+            continue
+        if index == 0 and header:
+            out.write('\t'.join(row) + '\n')
+        out.write('\t'.join(f"{value:.2f}" if isinstance(value, float) else str(value)
+                            for value in row.values()) + '\n')
+
+def read_fasta_file(filename):
+    """Read a FASTA file and return the DNA sequence, ignoring header lines."""
+    sequence = ''.join(read_fasta_chunks(filename))
+    if not sequence:
+        logger.warning("No sequence data found in file")
+    return sequence
+
+def _positive_int(text):
+    """argparse type for counts that must be at least 1."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
 def main():
-    # Check if filename is provided as command line argument
-    if len(sys.argv) != 2:
-        print("Usage: python GC_content_calculator.py <fasta_file>")
-        print("Current working directory:", os.getcwd())
+    parser = argparse.ArgumentParser(description="Calculate the GC content of FASTA files.")
+    parser.add_argument("fasta_files", nargs="+", help="FASTA files or glob patterns (e.g. 'data/*.fa')")
+    parser.add_argument("--per-record", action="store_true",
+                        help="print length, GC content and invalid base count for every record")
+    parser.add_argument("--window", type=int,
+                        help="print the GC content of sliding windows of this many bases as BED rows")
+    parser.add_argument("--step", type=int, default=100,
+                        help="distance between the starts of consecutive windows (default: 100)")
+    parser.add_argument("--workers", type=_positive_int,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--region", action="append",
+                        help="GC content of a region such as chr7:1,000,000-2,000,000 (repeatable); "
+                             "uses the file's .fai index, building it if needed")
+    parser.add_argument("--index", action="store_true",
+                        help="write a samtools-compatible .fai index next to each file")
+    parser.add_argument("--kmer", type=int, metavar="K",
+                        help=f"print the k-mer spectrum (k from 1 to {MAX_K}) of all records")
+    parser.add_argument("--cpg", action="store_true",
+                        help="print CpG count and CpG observed/expected ratio for every record")
+    parser.add_argument("--format", choices=("text", "tsv", "jsonl"), default="text",
+                        help="output format: human-readable text (default), TSV or JSON lines")
+    parser.add_argument("--log-level", choices=("debug", "info", "warning", "error"), default="error",
+                        help="diagnostics written to stderr (default: error, i.e. only errors)")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s: %(message)s")
+    output_format = "tsv" if args.format == "text" else args.format
+    paths = expand_fasta_paths(args.fasta_files)
+
+    try:
+        if args.index:
+            for filename in paths:
+                build_fasta_index(filename)
+            return
+        if args.kmer is not None:
+            write_rows(file_rows(paths, lambda filename: kmer_rows(filename, args.kmer)), output_format)
+            return
+        if args.cpg:
+            write_rows(file_rows(paths, cpg_rows), output_format)
+            return
+        if args.region:
+            write_rows(file_rows(paths, lambda filename: region_rows(filename, args.region)), output_format)
+            return
+        if args.window is not None:
+            # plain text keeps the output valid BED: no header line
+            for index, filename in enumerate(paths):
+                write_rows(window_rows(filename, args.window, args.step), output_format,
+                           header=args.format == "tsv" and index == 0)
+            return
+    except ValueError as e:
+        logger.error("%s", e)
         sys.exit(1)
+
+    if args.per_record:
+        write_rows(gc_report_rows(paths, args.workers), output_format)
+        return
+
+    if len(paths) > 1 or args.format != "text":
+        write_rows(gc_summary_rows(paths, args.workers), output_format)
+        return
     
-    # Get filename from command line argument
-    filename = sys.argv[1]
-    
-    # Read the sequence from the file
-    sequence = read_fasta_file(filename)
+    # Count the bases directly on the memory-mapped file
+    filename = paths[0]
+    counter = parallel_gc_report(paths, args.workers, per_record=False)[0]
+    preview = next(read_fasta_chunks(filename, chunk_size=256), "")[:50]
     
-    print(f"Read sequence length: {len(sequence)}")
-    if sequence:
-        print(f"First 50 characters: {sequence[:50]}...")
+    print(f"Read sequence length: {counter.total_bases}")
+    if preview:
+        print(f"First 50 characters: {preview}...")
     
     # Validate sequence
-    if not validate_sequence(sequence):
+    if counter.invalid_chars:
+        print(f"Warning: Found invalid characters in sequence: {counter.invalid_chars}")
         print("Warning: Sequence contains invalid characters")
     
     # Calculate and print GC content
-    gc_content = calculate_gc_content(sequence)
+    gc_content = counter.gc_content()
     print(f"GC content: {gc_content:.2f}%")
 
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+"""benchmark.py
+
+Benchmark the GC content pipeline on synthetic FASTA files.
+
+Usage:
+    python benchmark.py [--size 100MB] [--records 1] [--line-width 60] [--stages ...]
+
+A FASTA file of the requested size, record count and line width is generated
+(deterministically, in constant memory), then every stage is timed in a fresh
+process so its peak RSS can be measured on its own. Throughput is reported in
+MB/s of FASTA input. Results are appended to benchmark_results.jsonl together
+with the git revision, and each stage is compared with the last stored run
+that used the same parameters, so regressions between versions are visible.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from queue import Empty
+
+import numpy as np
+
+import GC_content_calculator as gc
+
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_results.jsonl")
+UNITS = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+
+def parse_size(text):
+    """Parse sizes such as '1MB', '10GB' or '5000' (bytes)."""
+    text = text.strip().upper()
+    for unit, factor in UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def write_synthetic_fasta(path, size, records=1, line_width=60, seed=0):
+    """Write a FASTA file of about size bytes with random ACGT (and a few N) bases."""
+    rng = np.random.default_rng(seed)
+    alphabet = np.frombuffer(b"ACGTACGTACGTACGN", dtype=np.uint8)
+    per_record = max(1, size // records)
+    block_lines = max(1, (1 << 20) // (line_width + 1))
+    with open(path, "wb") as fh:
+        for record in range(records):
+            fh.write(f">seq{record} synthetic\n".encode())
+            remaining = per_record * line_width // (line_width + 1)
+            while remaining > 0:
+                bases = min(remaining, block_lines * line_width)
+                codes = alphabet[rng.integers(0, len(alphabet), bases)]
+                lines = len(codes) // line_width
+                full = codes[:lines * line_width].reshape(lines, line_width)
+                newline = np.full((lines, 1), ord("\n"), dtype=np.uint8)
+                fh.write(np.hstack((full, newline)).tobytes())
+                if len(codes) % line_width:
+                    fh.write(codes[lines * line_width:].tobytes() + b"\n")
+                remaining -= bases
+
+
+def _stage_read_fasta_file(path):
+    gc.read_fasta_file(path)
+
+
+def _stage_validate_sequence(path):
+    sequence = gc.read_fasta_file(path)
+    start = time.perf_counter()
+    gc.validate_sequence(sequence)
+    return time.perf_counter() - start
+
+
+def _stage_calculate_gc_content(path):
+    sequence = gc.read_fasta_file(path)
+    start = time.perf_counter()
+    gc.calculate_gc_content(sequence)
+    return time.perf_counter() - start
+
+
+def _stage_streaming(path):
+    counter = gc.GCCounter()
+    for chunk in gc.read_fasta_chunks(path):
+        counter.update(chunk)
+
+
+def _stage_mmap(path):
+    gc.count_fasta_mmap(path)
+
+
+def _stage_parallel(path):
+    gc.parallel_gc_report([path], per_record=False)
+
+
+# stages that hold the whole sequence in memory; skipped by default above WHOLE_STRING_MAX_SIZE
+WHOLE_STRING_STAGES = ("read_fasta_file", "validate_sequence", "calculate_gc_content")
+WHOLE_STRING_MAX_SIZE = 1 << 30
+
+# stage name -> function; a function may return its own timing to exclude setup (e.g. reading the file)
+STAGES = {
+    "read_fasta_file": _stage_read_fasta_file,
+    "validate_sequence": _stage_validate_sequence,
+    "calculate_gc_content": _stage_calculate_gc_content,
+    "streaming": _stage_streaming,
+    "mmap": _stage_mmap,
+    "parallel": _stage_parallel,
+}
+
+
+def _run_stage(name, path, queue):
+    start = time.perf_counter()
+    measured = STAGES[name](path)
+    seconds = measured if measured is not None else time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux
+    queue.put((seconds, peak_kb / 1024))
+
+
+def time_stage(name, path, timeout=None):
+    """Run one stage in a fresh process and return (seconds, peak RSS in MB).
+
+    Returns None if the stage failed: its process died without a result (an
+    exception, or killed e.g. by the OOM killer) or ran longer than timeout seconds.
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_stage, args=(name, path, queue))
+    process.start()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=1)
+        except Empty:
+            if process.exitcode is not None:
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                process.terminate()
+                break
+    process.join()
+    if result is None:
+        print(f"stage {name} failed (exit code {process.exitcode})", file=sys.stderr)
+    return result
+
+
+def default_stages(size):
+    """All stages, without the whole-string ones for files above WHOLE_STRING_MAX_SIZE."""
+    if size > WHOLE_STRING_MAX_SIZE:
+        return [name for name in STAGES if name not in WHOLE_STRING_STAGES]
+    return list(STAGES)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_previous(params, results_file=RESULTS_FILE):
+    """Return the last stored result with the same parameters, or None."""
+    previous = None
+    if os.path.exists(results_file):
+        with open(results_file) as fh:
+            for line in fh:
+                result = json.loads(line)
+                if result["params"] == params:
+                    previous = result
+    return previous
+
+
+def run_benchmark(size, records, line_width, stages, results_file=RESULTS_FILE, keep=None, timeout=None):
+    """Benchmark the given stages on a synthetic file and append the result to results_file.
+
+    A stage that fails (see `time_stage`) is stored as {"failed": true}.
+    """
+    params = {"size": size, "records": records, "line_width": line_width}
+    previous = load_previous(params, results_file)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = keep or os.path.join(tmp, "synthetic.fasta")
+        if not os.path.exists(path):
+            write_synthetic_fasta(path, size, records, line_width)
+        file_mb = os.path.getsize(path) / (1 << 20)
+        result = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "params": params,
+            "stages": {},
+        }
+        print(f"{file_mb:.1f} MB, {records} records, line width {line_width} (revision {result['revision']})")
+        print(f"{'stage':<22}{'seconds':>10}{'MB/s':>10}{'peak MB':>10}{'vs last':>10}")
+        for name in stages:
+            timing = time_stage(name, path, timeout)
+            if timing is None:
+                result["stages"][name] = {"failed": True}
+                print(f"{name:<22}{'failed':>10}")
+                continue
+            seconds, peak_mb = timing
+            throughput = file_mb / seconds if seconds else float("inf")
+            result["stages"][name] = {"seconds": round(seconds, 4), "mb_per_s": round(throughput, 1),
+                                      "peak_rss_mb": round(peak_mb, 1)}
+            change = ""
+            if previous and "seconds" in previous["stages"].get(name, {}):
+                before = previous["stages"][name]["seconds"]
+                change = f"{(seconds - before) / before * 100:+.0f}%" if before else ""
+            print(f"{name:<22}{seconds:>10.3f}{throughput:>10.1f}{peak_mb:>10.1f}{change:>10}")
+    with open(results_file, "a") as fh:
+        fh.write(json.dumps(result) + "\n")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GC content pipeline.")
+    parser.add_argument("--size", default="100MB", help="FASTA file size, e.g. 1MB, 500MB, 10GB (default: 100MB)")
+    parser.add_argument("--records", type=int, default=1, help="number of records (default: 1)")
+    parser.add_argument("--line-width", type=int, default=60, help="bases per line (default: 60)")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES),
+                        help="stages to time (default: all, except the whole-string stages "
+                             f"{', '.join(WHOLE_STRING_STAGES)} above {WHOLE_STRING_MAX_SIZE >> 30} GB)")
+    parser.add_argument("--timeout", type=float, help="seconds after which a stage is stopped and reported as failed")
+    parser.add_argument("--results", default=RESULTS_FILE, help="JSON lines file the results are appended to")
+    parser.add_argument("--keep", help="reuse / keep the synthetic FASTA file at this path")
+    args = parser.parse_args(argv)
+    size = parse_size(args.size)
+    stages = args.stages or default_stages(size)
+    run_benchmark(size, args.records, args.line_width, stages, args.results, args.keep, args.timeout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+import gzip
+import io
+import json
+import os
+import struct
+import sys
+import zlib
+
+import pytest
+
+import GC_content_calculator as gc
+import benchmark
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "test_sequence.fasta")
+
+
+def write_fasta(tmp_path, text, name="test.fasta"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+# -----------------------------
+#  Tests for read_fasta_chunks
+# -----------------------------
+def test_read_fasta_chunks_skips_headers_and_whitespace(tmp_path):
+    path = write_fasta(tmp_path, ">seq1 desc\nACGT\nGG\n>seq2\nCC\n\n")
+    assert "".join(gc.read_fasta_chunks(path)) == "ACGTGGCC"
+
+def test_read_fasta_chunks_small_blocks(tmp_path):
+    # headers and lines split across block boundaries
+    path = write_fasta(tmp_path, ">a long header line\nACGTAC\nGT\n>b\nTTGC\n")
+    chunks = list(gc.read_fasta_chunks(path, chunk_size=3))
+    assert "".join(chunks) == "ACGTACGTTTGC"
+    assert all(len(chunk) <= 3 for chunk in chunks)
+
+def test_read_fasta_file_matches_chunks():
+    assert gc.read_fasta_file(SAMPLE) == "".join(gc.read_fasta_chunks(SAMPLE))
+
+# -----------------------------
+#  Tests for GCCounter
+# -----------------------------
+def test_gc_counter_matches_calculate_gc_content():
+    counter = gc.GCCounter()
+    for chunk in ["acgt", "GGCC", "AT"]:
+        counter.update(chunk)
+    assert counter.total_bases == 10
+    assert counter.gc_content() == gc.calculate_gc_content("acgtGGCCAT")
+    assert not counter.invalid_chars
+
+def test_gc_counter_invalid_chars():
+    counter = gc.GCCounter()
+    counter.update("ACNx")
+    assert counter.invalid_chars == {"N", "X"}
+
+# -----------------------------
+#  Tests for read_fasta_records / gc_report
+# -----------------------------
+def test_read_fasta_records_pairs(tmp_path):
+    path = write_fasta(tmp_path, ">a first\nACGT\n>b\n>c\nCC")
+    records = list(gc.read_fasta_records(path))
+    assert records == [("a first", ""), ("a first", "ACGT"), ("b", ""), ("c", ""), ("c", "CC")]
+
+def test_gc_report_per_record(tmp_path):
+    path = write_fasta(tmp_path, ">a first\nACGT\nGGNN\n>b\n\n>c\nCCCC\n")
+    report = [(gc.record_name(h), c.total_bases, c.gc_count, c.invalid_count)
+              for h, c in gc.gc_report(path, chunk_size=3)]
+    assert report == [("a", 8, 4, 2), ("b", 0, 0, 0), ("c", 4, 4, 0)]
+
+# -----------------------------
+#  Tests for the mmap engine
+# -----------------------------
+def test_gc_report_mmap_matches_streaming(tmp_path):
+    path = write_fasta(tmp_path, "ACGT\n>a first\nACgt\r\nGGNN\n>b\n>c\nCCxC")
+    streamed = [(h, c.total_bases, c.gc_count, c.invalid_count, c.invalid_chars)
+                for h, c in gc.gc_report(path)]
+    mapped = [(h, c.total_bases, c.gc_count, c.invalid_count, c.invalid_chars)
+              for h, c in gc.gc_report_mmap(path, window=3)]
+    assert mapped == streamed
+
+def test_count_fasta_mmap_empty_file(tmp_path):
+    path = write_fasta(tmp_path, "")
+    assert gc.count_fasta_mmap(path).total_bases == 0
+
+# -----------------------------
+#  Tests for base_composition
+# -----------------------------
+def test_base_composition_counts():
+    assert gc.base_composition("ACgtNn-x\nAA") == {"A": 3, "C": 1, "G": 1, "T": 1, "N": 2, "other": 2}
+
+def test_validate_sequence():
+    assert gc.validate_sequence("acgtACGT")
+    assert not gc.validate_sequence("ACGRN")
+
+# -----------------------------
+#  Tests for gc_windows
+# -----------------------------
+def test_gc_windows_matches_naive(tmp_path):
+    sequence = "ACGTGGCCAATTGCGCNNAT" * 7
+    path = write_fasta(tmp_path, ">chr1 test\n" + "\n".join(sequence[i:i + 13] for i in range(0, len(sequence), 13)) + "\n>chr2\nGC\n")
+    expected = [("chr1", start, start + 20, gc.calculate_gc_content(sequence[start:start + 20].replace("N", "A")))
+                for start in range(0, len(sequence) - 20 + 1, 7)]
+    # small chunks force windows to span chunk boundaries
+    assert list(gc.gc_windows(path, window=20, step=7, chunk_size=16)) == expected
+
+# -----------------------------
+#  Tests for parallel_gc_report
+# -----------------------------
+def test_parallel_gc_report_matches_serial(tmp_path):
+    paths = [write_fasta(tmp_path, ">a\nACGTGG\nCC\n>b\n>c\nNNAT\n", "one.fasta"),
+             write_fasta(tmp_path, "GGCC\n>d\nATATGC\n", "two.fasta"),
+             write_fasta(tmp_path, "", "empty.fasta")]
+    serial = [[(h, c.byte_counts.tolist()) for h, c in gc.gc_report_mmap(path)] for path in paths]
+    # a tiny split size spreads single records over several worker tasks
+    parallel = gc.parallel_gc_report(paths, workers=2, split_size=3)
+    assert [[(h, c.byte_counts.tolist()) for h, c in records] for records in parallel] == serial
+    totals = gc.parallel_gc_report(paths, workers=1, per_record=False)
+    assert [c.total_bases for c in totals] == [12, 10, 0]
+
+def test_expand_fasta_paths(tmp_path):
+    write_fasta(tmp_path, ">a\nAC\n", "b.fasta")
+    write_fasta(tmp_path, ">a\nAC\n", "a.fasta")
+    pattern = str(tmp_path / "*.fasta")
+    assert gc.expand_fasta_paths([pattern, "missing.fasta"]) == [
+        str(tmp_path / "a.fasta"), str(tmp_path / "b.fasta"), "missing.fasta"]
+
+# -----------------------------
+#  Tests for compressed input
+# -----------------------------
+def write_bgzf(path, data, block_size=7):
+    """Write data as BGZF blocks of block_size uncompressed bytes, plus the EOF block."""
+    with open(path, "wb") as fh:
+        for pos in list(range(0, len(data), block_size)) + [len(data)]:
+            piece = data[pos:pos + block_size]
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            cdata = compressor.compress(piece) + compressor.flush()
+            bsize = 12 + 6 + len(cdata) + 8 - 1
+            fh.write(b"\x1f\x8b\x08\x04" + bytes(6) + struct.pack("<HccHH", 6, b"B", b"C", 2, bsize))
+            fh.write(cdata + struct.pack("<II", zlib.crc32(piece), len(piece)))
+    return str(path)
+
+def test_compressed_fasta_matches_plain(tmp_path):
+    text = ">a first\nACGTGG\nCCNN\n>b\n>c\nGGGATC\n"
+    plain = write_fasta(tmp_path, text)
+    gzipped = str(tmp_path / "test.fasta.gz")
+    with gzip.open(gzipped, "wt") as fh:
+        fh.write(text)
+    bgzf = write_bgzf(tmp_path / "test.fasta.bgz", text.encode())
+    assert gc.fasta_compression(plain) is None
+    assert gc.fasta_compression(gzipped) == "gzip"
+    assert gc.fasta_compression(bgzf) == "bgzf"
+    expected = list(gc.read_fasta_records(plain))
+    assert list(gc.read_fasta_records(gzipped)) == expected
+    assert [h for h, c in gc.read_fasta_records(bgzf) if not c] == [h for h, c in expected if not c]
+    assert "".join(gc.read_fasta_chunks(bgzf)) == "".join(gc.read_fasta_chunks(plain))
+    reports = gc.parallel_gc_report([plain, gzipped, bgzf], workers=2, split_size=4)
+    counts = [[(h, c.composition()) for h, c in records] for records in reports]
+    assert counts[0] == counts[1] == counts[2]
+
+# -----------------------------
+#  Tests for the .fai index and region queries
+# -----------------------------
+def test_build_fasta_index(tmp_path):
+    path = write_fasta(tmp_path, ">chr1 desc\nACGTA\nCGTAC\nGG\n>chr2\nAAAA\n")
+    entries = gc.build_fasta_index(path)
+    assert entries == [gc.FaiEntry("chr1", 12, 11, 5, 6), gc.FaiEntry("chr2", 4, 32, 4, 5)]
+    with open(path + ".fai") as fai:
+        assert fai.read() == "chr1\t12\t11\t5\t6\nchr2\t4\t32\t4\t5\n"
+
+def test_build_fasta_index_uneven_lines(tmp_path):
+    path = write_fasta(tmp_path, ">chr1\nACGTA\nCG\nGTACG\n")
+    with pytest.raises(ValueError):
+        gc.build_fasta_index(path)
+
+def test_parse_region():
+    assert gc.parse_region("chr7:1,000,000-2,000,000") == ("chr7", 999999, 2000000)
+    assert gc.parse_region("chr7") == ("chr7", 0, None)
+    assert gc.parse_region("chr7:10-") == ("chr7", 9, None)
+
+def test_region_gc(tmp_path):
+    sequence = "ACGTNGGCCATATGCGCGTTA"
+    path = write_fasta(tmp_path, ">chr1\n" + "\n".join(sequence[i:i + 4] for i in range(0, len(sequence), 4)) + "\n")
+    for start, end in [(1, 21), (3, 9), (4, 5), (8, 8), (17, 100)]:
+        counter = gc.region_gc(path, f"chr1:{start}-{end}")
+        assert counter.composition() == gc.base_composition(sequence[start - 1:end])
+
+def test_region_gc_name_with_colons(tmp_path):
+    path = write_fasta(tmp_path, ">HLA-A*01:01:01:01\nGGCA\n>HLA-A*01:01:01\nAAAA\n")
+    assert gc.region_gc(path, "HLA-A*01:01:01:01").composition() == gc.base_composition("GGCA")
+    assert gc.region_gc(path, "HLA-A*01:01:01:2-3").composition() == gc.base_composition("AA")
+
+def test_main_region_over_several_files(tmp_path, monkeypatch, capsys, caplog):
+    first = write_fasta(tmp_path, ">a\nACGT\n", "x1.fa")
+    second = write_fasta(tmp_path, ">b\nGGGG\n", "x2.fa")
+    monkeypatch.setattr(sys, "argv", ["GC_content_calculator.py", first, second, "--region", "a:1-2", "--region", "b"])
+    gc.main()
+    assert capsys.readouterr().out.splitlines() == [
+        "file\tregion\tlength\tgc_percent\tinvalid_bases",
+        f"{first}\ta:1-2\t2\t50.00\t0",
+        f"{second}\tb\t4\t100.00\t0",
+    ]
+    assert "sequence 'b' not found in " + first in caplog.text
+    assert "sequence 'a' not found in " + second in caplog.text
+
+# -----------------------------
+#  Tests for structured output
+# -----------------------------
+def test_write_rows_tsv_and_jsonl(tmp_path):
+    path = write_fasta(tmp_path, ">a\nACGT\n>b\nGGGC\n")
+    out = io.StringIO()
+    gc.write_rows(gc.gc_report_rows([path]), "tsv", out)
+    assert out.getvalue() == "name\tlength\tgc_percent\tinvalid_bases\na\t4\t50.00\t0\nb\t4\t100.00\t0\n"
+    out = io.StringIO()
+    gc.write_rows(gc.gc_summary_rows([path]), "jsonl", out)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert rows == [{"file": path, "length": 8, "gc_percent": 75.0, "invalid_bases": 0},
+                    {"file": "total", "length": 8, "gc_percent": 75.0, "invalid_bases": 0}]
+
+# -----------------------------
+#  Tests for k-mer and CpG statistics
+# -----------------------------
+def test_kmer_spectrum_matches_naive(tmp_path):
+    records = ["ACGTNacgtTTGCAAGCGC", "GGCNCCAT", "AC"]
+    path = write_fasta(tmp_path, "".join(f">r{i}\n{seq[:7]}\n{seq[7:]}\n" for i, seq in enumerate(records)))
+    for k in (1, 2, 3):
+        expected = {}
+        for seq in records:
+            seq = seq.upper()
+            for i in range(len(seq) - k + 1):
+                if "N" not in seq[i:i + k]:
+                    expected[seq[i:i + k]] = expected.get(seq[i:i + k], 0) + 1
+        # small chunks make k-mers span chunk boundaries, but never records
+        assert dict(gc.kmer_spectrum(path, k, chunk_size=4).spectrum()) == expected
+
+def test_kmer_counter_rejects_large_k():
+    with pytest.raises(ValueError):
+        gc.KmerCounter(gc.MAX_K + 1)
+
+def test_cpg_rows(tmp_path):
+    path = write_fasta(tmp_path, ">a\nCGCGAATT\n>b\nAAAA\n")
+    rows = list(gc.cpg_rows(path))
+    assert rows[0]["cpg_count"] == 2
+    assert rows[0]["cpg_o_e"] == 2 * 8 / (2 * 2)
+    assert rows[1]["cpg_o_e"] == 0.0
+
+
+# -----------------------------
+#  Tests for the benchmark harness
+# -----------------------------
+def _stage_dies(path):
+    os._exit(9)
+
+
+def test_benchmark_reports_failed_stage(tmp_path, monkeypatch):
+    monkeypatch.setitem(benchmark.STAGES, "dies", _stage_dies)
+    path = write_fasta(tmp_path, ">a\nACGT\n")
+    assert benchmark.time_stage("dies", path) is None
+    seconds, peak_mb = benchmark.time_stage("streaming", path)
+    assert seconds >= 0 and peak_mb > 0
+    assert "read_fasta_file" in benchmark.default_stages(1 << 20)
+    assert "read_fasta_file" not in benchmark.default_stages(10 << 30)
+
+
+def test_gc_counter_counts_match_composition():
+    counter = gc.GCCounter()
+    counter.update("ACGTNacgtnXY-\n \t")
+    composition = counter.composition()
+    assert counter.counts() == (sum(composition.values()), composition['G'] + composition['C'],
+                                composition['N'] + composition['other'])
+    assert counter.counts() == (13, 4, 5)
+
+
+def test_main_rejects_kmer_zero(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["GC_content_calculator.py", SAMPLE, "--kmer", "0"])
+    with pytest.raises(SystemExit) as excinfo:
+        gc.main()
+    assert excinfo.value.code == 1
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("option", [["--window", "0"], ["--window", "10", "--step", "0"]])
+def test_main_rejects_zero_window(monkeypatch, capsys, option):
+    monkeypatch.setattr(sys, "argv", ["GC_content_calculator.py", SAMPLE] + option)
+    with pytest.raises(SystemExit) as excinfo:
+        gc.main()
+    assert excinfo.value.code == 1
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("option", [["--kmer", "2"], ["--cpg"]])
+def test_main_adds_file_column_for_several_files(tmp_path, monkeypatch, capsys, option):
+    first = write_fasta(tmp_path, ">a\nACGT\n", "x1.fa")
+    second = write_fasta(tmp_path, ">b\nGGG\n", "x2.fa")
+    monkeypatch.setattr(sys, "argv", ["GC_content_calculator.py", first, second] + option)
+    gc.main()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split("\t")[0] == "file"
+    files = [line.split("\t")[0] for line in lines[1:]]
+    assert files == sorted(files) and set(files) == {first, second}
+    monkeypatch.setattr(sys, "argv", ["GC_content_calculator.py", first] + option)
+    gc.main()
+    assert capsys.readouterr().out.split("\t")[0] != "file"
+
+
+def test_main_rejects_zero_workers(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["GC_content_calculator.py", SAMPLE, SAMPLE, "--workers", "0"])
+    with pytest.raises(SystemExit) as excinfo:
+        gc.main()
+    assert excinfo.value.code == 2
+    assert "must be at least 1" in capsys.readouterr().err
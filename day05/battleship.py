@@ -1,5 +1,6 @@
 
 import helper
+from bitboard import BitBoard
 
 
 def init_board(rows, columns):
@@ -33,6 +34,8 @@ def valid_ship(board, size, loc):
     """
     This function checks if a ship with a specific size can get into the board.
     """
+    if isinstance(board, BitBoard):
+        return board.can_place(size, loc)
     rows_num = len(board)
     columns_num = len(board[0])
     row = loc[0]
@@ -66,14 +69,20 @@ def create_player_board(rows, columns, ship_sizes):
     return board
 
 
-def fire_torpedo(board, loc):
+def fire_torpedo(board, loc, turn_state=None):
     """
     This function changes the board by playing the game
+    param turn_state: a TurnState of the board, updated with the shot.
     """
     row = loc[0]
     column = loc[1]
     if row >= len(board) or column >= len(board[0]):
         return board
+    if turn_state is not None:
+        turn_state.record(board[row][column], loc)
+    if isinstance(board, BitBoard):
+        board.fire(loc)
+        return board
     if board[row][column] == helper.WATER:
         board[row][column] = helper.HIT_WATER
     if board[row][column] == helper.SHIP:
@@ -104,6 +113,8 @@ def list_of_locations_for_ships(board, ship_size):
     """
     This function returns a list of tuples. The tuples represent the locations that are empty.
     """
+    if isinstance(board, BitBoard):
+        return sorted(board.cells(board.ship_starts(ship_size)), key=lambda loc: (loc[1], loc[0]))
     locations = []
     max_row = len(board)-ship_size
     for i in range(len(board[0])):
@@ -120,6 +131,8 @@ def list_of_locations_for_bump(board):
     """
     This function returns a list of tuples. The tuples represents the locations that are good for bump.
     """
+    if isinstance(board, BitBoard):
+        return board.cells(board.untargeted())
     locations = []
     for i in range(len(board)):
         for j in range(len(board[0])):
@@ -128,6 +141,51 @@ def list_of_locations_for_bump(board):
     return locations
 
 
+class UntargetedCells:
+    """
+    The cells of a board that were not fired at yet, in a list with an index of each cell,
+    so a cell is removed in O(1) (the last cell takes its place). The list is not sorted.
+    """
+
+    def __init__(self, cells):
+        self.cells = list(cells)
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+
+    def remove(self, cell):
+        i = self.index.pop(cell, None)
+        if i is None:
+            return
+        last = self.cells.pop()
+        if i < len(self.cells):
+            self.cells[i] = last
+            self.index[last] = i
+
+    def __contains__(self, cell):
+        return cell in self.index
+
+    def __len__(self):
+        return len(self.cells)
+
+
+class TurnState:
+    """
+    This class keeps the number of hit ship cells of a board and its untargeted cells,
+    updated by fire_torpedo on every shot, so a turn does not rescan the board.
+    """
+
+    def __init__(self, board):
+        self.hits = count_bumps(board)
+        self.untargeted = UntargetedCells(list_of_locations_for_bump(board))
+
+    def record(self, sign, loc):
+        """
+        This function updates the state with a shot at loc on a cell that was sign before it.
+        """
+        if sign == helper.SHIP:
+            self.hits += 1
+        self.untargeted.remove(loc)
+
+
 def hidden_board():
     """
     This function makes the board for the computer.
@@ -165,6 +223,13 @@ def hit_point(visual_board, hidden_board, row, column):
     """
     This function change the visual board for the computer after a hit.
     """
+    if isinstance(hidden_board, BitBoard):
+        bit = hidden_board.bit(row, column)
+        if hidden_board.masks[helper.WATER] & bit:
+            visual_board[row][column] = helper.HIT_WATER
+        elif hidden_board.masks[helper.SHIP] & bit:
+            visual_board[row][column] = helper.HIT_SHIP
+        return visual_board
     if hidden_board[row][column] == helper.WATER:
         visual_board[row][column] = helper.HIT_WATER
     if hidden_board[row][column] == helper.SHIP:
@@ -176,6 +241,8 @@ def count_bumps(board):
     """
     This function counts the amount of bumps in the board.
     """
+    if isinstance(board, BitBoard):
+        return board.count(helper.HIT_SHIP)
     hits = 0
     for row in board:
         for sign in row:
@@ -184,9 +251,10 @@ def count_bumps(board):
     return hits
 
 
-def one_turn_player(board1, board2, computer_board, player_board):
+def one_turn_player(board1, board2, computer_board, player_board, turn_states=None):
     """
     This function operates 1 turn for the player.
+    param turn_states: (TurnState of board1, TurnState of computer_board), or None to scan board1.
     """
     user_bump = helper.get_input("choose a location for the torpedo bump: ")
     flag = check_input_including_size_hidden(board2, user_bump)
@@ -196,11 +264,16 @@ def one_turn_player(board1, board2, computer_board, player_board):
     upper_letter = change_to_upper(user_bump[0])
     final_str = upper_letter + user_bump[1:]
     row, column = cell_loc(final_str)
+    board1_state, computer_state = turn_states if turn_states is not None else (None, None)
     board2 = hit_point(board2, computer_board, row, column)
-    computer_board = fire_torpedo(computer_board, (row, column))
-    target = helper.choose_torpedo_target(player_board, list_of_locations_for_bump(board1))
+    computer_board = fire_torpedo(computer_board, (row, column), computer_state)
+    if board1_state is not None:
+        locations = board1_state.untargeted.cells
+    else:
+        locations = list_of_locations_for_bump(board1)
+    target = helper.choose_torpedo_target(player_board, locations)
     player_board = hit_point(player_board, board1, target[0], target[1])
-    board1 = fire_torpedo(board1, target)
+    board1 = fire_torpedo(board1, target, board1_state)
     return board1, board2, player_board, computer_board
 
 
@@ -214,11 +287,13 @@ def run_single_game():
     computer_board = hidden_board()  # the board with the ships only.
     player_board = init_board(helper.NUM_ROWS, helper.NUM_COLUMNS)  # the hidden board for the player.
     hit_ship_1, hit_ship_2 = 0, 0
+    turn_states = (TurnState(board1), TurnState(computer_board))
     sum_cor_ships = sum_sizes(helper.SHIP_SIZES)
     while hit_ship_1 < sum_cor_ships and hit_ship_2 < sum_cor_ships:  # while no one hit all of the ships.
         helper.print_board(board1, board2)
-        board1, board2, player_board, computer_board = one_turn_player(board1, board2, computer_board, player_board)
-        hit_ship_1, hit_ship_2 = count_bumps(board1), count_bumps(board2)
+        board1, board2, player_board, computer_board = one_turn_player(board1, board2, computer_board, player_board,
+                                                                       turn_states)
+        hit_ship_1, hit_ship_2 = turn_states[0].hits, turn_states[1].hits
     helper.print_board(board1, computer_board)
     if hit_ship_1 < hit_ship_2:
         ask_another_game = helper.get_input("You won!! congrats! would you like to play another game? (Y/N): ")
@@ -0,0 +1,186 @@
+import helper
+
+STATES = (helper.WATER, helper.SHIP, helper.HIT_WATER, helper.HIT_SHIP)
+
+
+def _bits(mask):
+    """
+    This function returns the indexes of the set bits of mask, from the lowest.
+    (Reading the binary string once is linear; peeling off bits one at a time would copy the big int per bit.)
+    """
+    binary = bin(mask)[:1:-1]
+    indexes = []
+    index = binary.find('1')
+    while index != -1:
+        indexes.append(index)
+        index = binary.find('1', index + 1)
+    return indexes
+
+
+class BitBoard:
+    """
+    A board stored as one integer bitmask per cell state (bit row * columns + column).
+    Counting, ship placement and hit testing are done with a few integer operations
+    instead of scanning the cells. board[row][column] still reads and writes cells
+    like the list of lists from init_board, so helper.print_board works on it.
+    """
+
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self.full = (1 << (rows * columns)) - 1
+        self.masks = dict.fromkeys(STATES, 0)
+        self.masks[helper.WATER] = self.full
+        self._ship_masks = {}
+
+    @classmethod
+    def from_list(cls, board):
+        """
+        This function makes a BitBoard from a list of lists board.
+        """
+        bitboard = cls(len(board), len(board[0]))
+        bitboard.masks[helper.WATER] = 0
+        for i, row in enumerate(board):
+            for j, state in enumerate(row):
+                bitboard.masks[state] |= 1 << (i * bitboard.columns + j)
+        return bitboard
+
+    def to_list(self):
+        return [[self.get(i, j) for j in range(self.columns)] for i in range(self.rows)]
+
+    def bit(self, row, column):
+        return 1 << (row * self.columns + column)
+
+    def get(self, row, column):
+        bit = self.bit(row, column)
+        for state, mask in self.masks.items():
+            if mask & bit:
+                return state
+        return None
+
+    def set(self, row, column, state):
+        bit = self.bit(row, column)
+        for key in self.masks:
+            self.masks[key] &= ~bit
+        self.masks[state] |= bit
+
+    def count(self, state):
+        """
+        This function counts the cells in a state (popcount of its mask).
+        """
+        return bin(self.masks[state]).count('1')
+
+    def ship_mask(self, size, loc):
+        """
+        This function returns the mask of a vertical ship of size whose top is loc.
+        """
+        column_mask = self._ship_masks.get(size)
+        if column_mask is None:
+            column_mask = 0
+            for i in range(size):
+                column_mask |= 1 << (i * self.columns)
+            self._ship_masks[size] = column_mask
+        return column_mask << (loc[0] * self.columns + loc[1])
+
+    def can_place(self, size, loc):
+        """
+        This function checks that a vertical ship fits in the board on water cells only.
+        """
+        row, column = loc
+        if row < 0 or column < 0 or row + size > self.rows or column >= self.columns:
+            return False
+        mask = self.ship_mask(size, loc)
+        return self.masks[helper.WATER] & mask == mask
+
+    def place_ship(self, size, loc):
+        mask = self.ship_mask(size, loc)
+        self.masks[helper.WATER] &= ~mask
+        self.masks[helper.SHIP] |= mask
+
+    def is_hit(self, loc):
+        """
+        This function checks if a torpedo at loc hits a ship (hit before or not).
+        """
+        return bool((self.masks[helper.SHIP] | self.masks[helper.HIT_SHIP]) & self.bit(*loc))
+
+    def fire(self, loc):
+        """
+        This function fires a torpedo at loc: water becomes hit water and a ship becomes a hit ship.
+        """
+        bit = self.bit(*loc)
+        for before, after in ((helper.WATER, helper.HIT_WATER), (helper.SHIP, helper.HIT_SHIP)):
+            if self.masks[before] & bit:
+                self.masks[before] ^= bit
+                self.masks[after] |= bit
+
+    def untargeted(self):
+        """
+        This function returns the mask of the cells that were not fired at.
+        """
+        return self.full & ~(self.masks[helper.HIT_WATER] | self.masks[helper.HIT_SHIP])
+
+    def cells(self, mask):
+        """
+        This function returns the (row, column) of the set bits of mask, row by row.
+        """
+        return [divmod(index, self.columns) for index in _bits(mask)]
+
+    def ship_starts(self, size):
+        """
+        This function returns the mask of the tops of the vertical ships of size that do not
+        overlap a ship: the free cells shifted up by 0..size-1 rows, ANDed together.
+        """
+        if size > self.rows:
+            return 0
+        free = self.full & ~self.masks[helper.SHIP]
+        starts = (1 << ((self.rows - size + 1) * self.columns)) - 1
+        for i in range(size):
+            starts &= free >> (i * self.columns)
+        return starts
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        if not 0 <= row < self.rows:
+            raise IndexError(row)
+        return _BitBoardRow(self, row)
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield _BitBoardRow(self, row)
+
+    def __eq__(self, other):
+        if isinstance(other, BitBoard):
+            return (self.rows, self.columns, self.masks) == (other.rows, other.columns, other.masks)
+        return self.to_list() == other
+
+
+class _BitBoardRow:
+    """
+    One row of a BitBoard that reads and writes cells like a list.
+    """
+
+    def __init__(self, board, row):
+        self.board = board
+        self.row = row
+
+    def __len__(self):
+        return self.board.columns
+
+    def __getitem__(self, column):
+        if not 0 <= column < self.board.columns:
+            raise IndexError(column)
+        return self.board.get(self.row, column)
+
+    def __setitem__(self, column, state):
+        if not 0 <= column < self.board.columns:
+            raise IndexError(column)
+        self.board.set(self.row, column, state)
+
+    def __iter__(self):
+        for column in range(self.board.columns):
+            yield self.board.get(self.row, column)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
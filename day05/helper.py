@@ -1,6 +1,9 @@
 
 import sys
 import random
+from collections import Counter, OrderedDict
+
+import numpy as np
 
 NUM_ROWS = 10
 NUM_COLUMNS = 8
@@ -52,8 +55,113 @@ def random_cell(cells):
 def choose_ship_location(board, size, locations):
     return random_cell(locations)
 
-def choose_torpedo_target(board, locations):
-    return random_cell(locations)
+def choose_random_torpedo_target(board, locations):
+    # locations is a list of the untargeted cells (a TurnState's unsorted list, or the row-by-row
+    # list_of_locations_for_bump), so it is used as given instead of sorting it every turn
+    return random.choice(locations)
+
+
+# a ship placement through n hit cells counts HIT_WEIGHT ** n times, so shots follow up on hits
+HIT_WEIGHT = 50
+# boards whose DensityTargeter is kept between calls (one per player in a game is enough)
+TARGETERS_KEPT = 4
+_targeters = OrderedDict()
+
+
+class DensityTargeter:
+    """
+    Hunt / target strategy for one board: every cell is scored by the number of placements of
+    the ships (vertical, sizes ship_sizes) that cover it and no missed cell, with placements
+    through hit cells weighted up by HIT_WEIGHT per hit. The next shot is the untargeted cell
+    with the highest score.
+    Ships are vertical, so a shot only changes the scores of its own column; after the first
+    call only that column is recomputed (with NumPy), not the whole board.
+    """
+
+    def __init__(self, board, ship_sizes=SHIP_SIZES):
+        self.board = board
+        self.rows = len(board)
+        self.columns = len(board[0])
+        self.sizes = sorted(Counter(size for size in ship_sizes if size <= self.rows).items())
+        rows = np.arange(self.rows)
+        # for each size, the first and one past the last placement start that covers each row
+        self.cover = {size: (np.maximum(rows - size + 1, 0), np.minimum(rows, self.rows - size) + 1)
+                      for size, _ in self.sizes}
+        self._reset()
+
+    def _reset(self):
+        """
+        This function reads the whole board again and recomputes all the scores.
+        """
+        state = np.array([list(row) for row in self.board], dtype=np.int8)
+        self.miss = state == HIT_WATER
+        self.hit = state == HIT_SHIP
+        self.unknown = ~(self.miss | self.hit)
+        self.remaining = int(self.unknown.sum())
+        self.density = np.zeros((self.rows, self.columns))
+        self.last = None
+        self._score(slice(None))
+
+    def _score(self, columns):
+        """
+        This function recomputes the scores of a slice of columns.
+        """
+        zeros = np.zeros((1, self.columns))[:, columns]
+        misses = np.concatenate((zeros, np.cumsum(self.miss[:, columns], axis=0)))
+        hits = np.concatenate((zeros, np.cumsum(self.hit[:, columns], axis=0)))
+        total = np.zeros((self.rows, misses.shape[1]))
+        for size, count in self.sizes:
+            starts = self.rows - size + 1
+            misses_in = misses[size:] - misses[:starts]
+            weights = np.where(misses_in == 0, count * np.power(float(HIT_WEIGHT), hits[size:] - hits[:starts]), 0.0)
+            summed = np.concatenate((zeros, np.cumsum(weights, axis=0)))
+            first, end = self.cover[size]
+            total += summed[end] - summed[first]
+        self.density[:, columns] = total
+
+    def _record(self, row, column, sign):
+        if sign == HIT_WATER:
+            self.miss[row, column] = True
+        elif sign == HIT_SHIP:
+            self.hit[row, column] = True
+        else:
+            return
+        self.unknown[row, column] = False
+        self.remaining -= 1
+        self._score(slice(column, column + 1))
+
+    def choose(self, locations):
+        """
+        This function returns the next cell to fire at; locations are the untargeted cells.
+        """
+        if self.last is not None:
+            row, column = self.last
+            self.last = None
+            if self.unknown[row, column]:
+                self._record(row, column, self.board[row][column])
+        if self.remaining != len(locations):
+            # the board changed in another way than by our last shot
+            self._reset()
+        scores = np.where(self.unknown, self.density, -1.0)
+        best = scores.max() if scores.size else -1.0
+        if best <= 0:
+            return random_cell(locations)
+        candidates = np.flatnonzero(scores == best)
+        index = int(candidates[random.randrange(len(candidates))])
+        self.last = divmod(index, self.columns)
+        return self.last
+
+
+def choose_torpedo_target(board, locations, ship_sizes=SHIP_SIZES):
+    targeter = _targeters.get(id(board))
+    if targeter is None or targeter.board is not board:
+        targeter = DensityTargeter(board, ship_sizes)
+        _targeters[id(board)] = targeter
+        if len(_targeters) > TARGETERS_KEPT:
+            _targeters.popitem(last=False)
+    else:
+        _targeters.move_to_end(id(board))
+    return targeter.choose(locations)
 
 def seed(a):
     random.seed(a)
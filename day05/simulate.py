@@ -0,0 +1,154 @@
+"""
+Headless computer-vs-computer battleship games, for comparing strategies.
+
+Usage:
+    python simulate.py [--games 100000] [--workers N] [--rows 10] [--columns 8] [--seed 0] [--players density random]
+
+A strategy is a pair of functions with the signatures of helper.choose_ship_location
+and helper.choose_torpedo_target. If choose_torpedo_target takes a ship_sizes argument,
+the ship sizes of the game are passed to it. Every game is seeded with helper.seed, so the same
+seed always plays the same game. Games are spread over a process pool and the mean
+number of turns to win is reported with a 95% confidence interval.
+"""
+import argparse
+import functools
+import inspect
+import math
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import battleship
+import helper
+
+Strategy = namedtuple('Strategy', ['choose_ship_location', 'choose_torpedo_target'])
+RANDOM = Strategy(helper.choose_ship_location, helper.choose_random_torpedo_target)
+DENSITY = Strategy(helper.choose_ship_location, helper.choose_torpedo_target)
+STRATEGIES = {'random': RANDOM, 'density': DENSITY}
+
+# games per task sent to a worker process
+CHUNK_SIZE = 1000
+
+
+def with_ship_sizes(strategy, ship_sizes):
+    """
+    This function returns the strategy with ship_sizes bound to its choose_torpedo_target,
+    if that function takes them (like helper.choose_torpedo_target), else the strategy as is.
+    """
+    if 'ship_sizes' not in inspect.signature(strategy.choose_torpedo_target).parameters:
+        return strategy
+    return strategy._replace(
+        choose_torpedo_target=functools.partial(strategy.choose_torpedo_target, ship_sizes=ship_sizes))
+
+
+def place_ships(rows, columns, ship_sizes, choose_ship_location):
+    """
+    This function makes a board with the ships placed by a strategy (like battleship.hidden_board).
+    """
+    board = battleship.init_board(rows, columns)
+    for ship in ship_sizes:
+        loc_ship = choose_ship_location(board, ship, battleship.list_of_locations_for_ships(board, ship))
+        for i in range(ship):
+            board[loc_ship[0] + i][loc_ship[1]] = helper.SHIP
+    return board
+
+
+def play_game(seed, strategies=(RANDOM, RANDOM), rows=helper.NUM_ROWS, columns=helper.NUM_COLUMNS,
+              ship_sizes=helper.SHIP_SIZES):
+    """
+    This function plays one game without input or printing and returns (winner, turns).
+    winner is 0 or 1 for the player that hit all the ships of the other, or None for a draw.
+    As in run_single_game, both players fire once every turn.
+    """
+    helper.seed(seed)
+    strategies = [with_ship_sizes(strategy, ship_sizes) for strategy in strategies]
+    boards = [place_ships(rows, columns, ship_sizes, strategy.choose_ship_location) for strategy in strategies]
+    views = [battleship.init_board(rows, columns) for _ in strategies]  # views[i]: what player i knows of the other board
+    states = [battleship.TurnState(boards[1]), battleship.TurnState(boards[0])]  # states[i]: board player i fires at
+    total = battleship.sum_sizes(ship_sizes)
+    turns = 0
+    while states[0].hits < total and states[1].hits < total:
+        turns += 1
+        for player, strategy in enumerate(strategies):
+            target_board = boards[1 - player]
+            target = strategy.choose_torpedo_target(views[player], states[player].untargeted.cells)
+            battleship.hit_point(views[player], target_board, target[0], target[1])
+            battleship.fire_torpedo(target_board, target, states[player])
+    hits = [state.hits for state in states]
+    if hits[0] == hits[1]:
+        return None, turns
+    return (0 if hits[0] > hits[1] else 1), turns
+
+
+def _play_chunk(task):
+    """
+    This function plays the games of one task and returns (wins, draws, sum of turns, sum of squared turns).
+    """
+    first_seed, games, strategies, rows, columns, ship_sizes = task
+    wins = [0, 0]
+    draws = total = squares = 0
+    for seed in range(first_seed, first_seed + games):
+        winner, turns = play_game(seed, strategies, rows, columns, ship_sizes)
+        if winner is None:
+            draws += 1
+        else:
+            wins[winner] += 1
+        total += turns
+        squares += turns * turns
+    return wins, draws, total, squares
+
+
+def simulate(games, strategies=(RANDOM, RANDOM), rows=helper.NUM_ROWS, columns=helper.NUM_COLUMNS,
+             ship_sizes=helper.SHIP_SIZES, workers=None, seed=0, chunk_size=CHUNK_SIZE):
+    """
+    This function plays games (seeded seed, seed + 1, ...) in a process pool and returns a summary dict:
+    games, wins per player, draws, mean_turns, ci95 (half width of the 95% confidence interval
+    of the mean), seconds and games_per_second.
+    """
+    tasks = [(first, min(chunk_size, seed + games - first), strategies, rows, columns, ship_sizes)
+             for first in range(seed, seed + games, chunk_size)]
+    start = time.perf_counter()
+    wins = [0, 0]
+    draws = total = squares = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_wins, chunk_draws, chunk_total, chunk_squares in executor.map(_play_chunk, tasks):
+            wins = [a + b for a, b in zip(wins, chunk_wins)]
+            draws += chunk_draws
+            total += chunk_total
+            squares += chunk_squares
+    seconds = time.perf_counter() - start
+    mean = total / games if games else 0.0
+    variance = (squares - games * mean * mean) / (games - 1) if games > 1 else 0.0
+    ci95 = 1.96 * math.sqrt(max(variance, 0.0) / games) if games > 1 else 0.0
+    return {
+        'games': games,
+        'wins': wins,
+        'draws': draws,
+        'mean_turns': mean,
+        'ci95': ci95,
+        'seconds': seconds,
+        'games_per_second': games / seconds if seconds else float('inf'),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play computer-vs-computer battleship games.")
+    parser.add_argument("--games", type=int, default=100000, help="number of games (default: 100000)")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--rows", type=int, default=helper.NUM_ROWS)
+    parser.add_argument("--columns", type=int, default=helper.NUM_COLUMNS)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game (default: 0)")
+    parser.add_argument("--players", nargs=2, choices=list(STRATEGIES), default=["density", "random"],
+                        help="strategies of the two players (default: density random)")
+    args = parser.parse_args(argv)
+    strategies = tuple(STRATEGIES[name] for name in args.players)
+    result = simulate(args.games, strategies, rows=args.rows, columns=args.columns, workers=args.workers, seed=args.seed)
+    print(f"{' vs '.join(args.players)}, {result['games']} games on {args.rows}x{args.columns}: "
+          f"mean {result['mean_turns']:.2f} +/- {result['ci95']:.2f} turns (95% CI)")
+    print(f"wins {result['wins'][0]} / {result['wins'][1]}, draws {result['draws']}")
+    print(f"{result['seconds']:.2f} s, {result['games_per_second']:.0f} games/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,11 @@
+import random
+
+import numpy as np
+
 import battleship
 import helper
+import simulate
+from bitboard import BitBoard
 
 # -----------------------------
 #  Tests for init_board
@@ -83,3 +89,179 @@ def test_list_locations_for_bump():
 def test_sum_sizes():
     assert battleship.sum_sizes([5, 3, 2]) == 10
     assert battleship.sum_sizes([]) == 0
+
+# -----------------------------
+#  Tests for BitBoard
+# -----------------------------
+def test_bitboard_matches_list_board():
+    rng = random.Random(5)
+    board = battleship.init_board(7, 6)
+    bits = BitBoard(7, 6)
+    for size in (5, 3, 3, 2):
+        assert battleship.list_of_locations_for_ships(bits, size) == battleship.list_of_locations_for_ships(board, size)
+        loc = rng.choice(battleship.list_of_locations_for_ships(board, size))
+        if battleship.valid_ship(board, size, loc):
+            for i in range(size):
+                board[loc[0] + i][loc[1]] = helper.SHIP
+            bits.place_ship(size, loc)
+    assert bits.to_list() == board
+    for loc in [(r, c) for r in range(8) for c in range(7)]:
+        for size in (1, 2, 4):
+            assert battleship.valid_ship(bits, size, loc) == battleship.valid_ship(board, size, loc)
+    for _ in range(30):
+        loc = (rng.randrange(7), rng.randrange(6))
+        visual_list, visual_bits = battleship.init_board(7, 6), BitBoard(7, 6)
+        battleship.hit_point(visual_list, board, *loc)
+        battleship.hit_point(visual_bits, bits, *loc)
+        assert visual_bits == visual_list
+        battleship.fire_torpedo(board, loc)
+        battleship.fire_torpedo(bits, loc)
+        assert bits.to_list() == board
+        assert battleship.count_bumps(bits) == battleship.count_bumps(board)
+        assert battleship.list_of_locations_for_bump(bits) == battleship.list_of_locations_for_bump(board)
+    assert BitBoard.from_list(board) == bits
+
+
+def test_bitboard_row_adapter(capsys):
+    bits = BitBoard(3, 4)
+    bits[1][2] = helper.SHIP
+    assert bits.is_hit((1, 2)) and not bits.is_hit((0, 2))
+    assert len(bits) == 3 and len(bits[0]) == 4
+    assert bits[1][2] == helper.SHIP and list(bits[0]) == [helper.WATER] * 4
+    assert bits.count(helper.WATER) == 11
+    helper.print_board(bits)
+    board = battleship.init_board(3, 4)
+    board[1][2] = helper.SHIP
+    printed = capsys.readouterr().out
+    helper.print_board(board)
+    assert printed == capsys.readouterr().out
+
+# -----------------------------
+#  Tests for simulate
+# -----------------------------
+def first_location(board, locations):
+    return locations[0]
+
+
+def test_play_game_is_seeded_and_pluggable():
+    assert simulate.play_game(7) == simulate.play_game(7)
+    scanner = simulate.Strategy(helper.choose_ship_location, first_location)
+    winner, turns = simulate.play_game(3, (scanner, scanner), rows=4, columns=3, ship_sizes=(2,))
+    # both players scan row by row and their ships were placed at random
+    assert 1 <= turns <= 12
+    assert winner in (0, 1, None)
+
+
+def test_play_game_passes_ship_sizes_to_targeting():
+    helper._targeters.clear()
+    simulate.play_game(5, (simulate.DENSITY, simulate.RANDOM), rows=4, columns=3, ship_sizes=(2,))
+    assert [targeter.sizes for targeter in helper._targeters.values()] == [[(2, 1)]]
+    # a strategy without a ship_sizes argument is left as it is
+    scanner = simulate.Strategy(helper.choose_ship_location, first_location)
+    assert simulate.with_ship_sizes(scanner, (2,)) is scanner
+
+
+def test_density_targeter_resets_when_board_changes():
+    view = battleship.init_board(6, 3)
+    targeter = helper.DensityTargeter(view, (3, 2))
+    view[0][0] = helper.HIT_WATER
+    targeter.choose([(i, j) for i in range(6) for j in range(3) if (i, j) != (0, 0)])
+    assert targeter.sizes == [(2, 1), (3, 1)] and targeter.miss[0, 0] and targeter.remaining == 17
+
+def test_simulate_summary():
+    result = simulate.simulate(20, rows=5, columns=4, ship_sizes=(3, 2), workers=2, chunk_size=6)
+    assert result['games'] == 20
+    assert sum(result['wins']) + result['draws'] == 20
+    assert 5 <= result['mean_turns'] <= 20  # 5 ship cells, at most 20 cells
+    assert result['ci95'] >= 0 and result['games_per_second'] > 0
+    again = simulate.simulate(20, rows=5, columns=4, ship_sizes=(3, 2), workers=1)
+    assert (again['wins'], again['mean_turns']) == (result['wins'], result['mean_turns'])
+
+# -----------------------------
+#  Tests for TurnState
+# -----------------------------
+def test_turn_state_tracks_shots():
+    rng = random.Random(2)
+    board = battleship.init_board(6, 5)
+    for i in range(4):
+        board[i][2] = helper.SHIP
+    board[0][0] = helper.HIT_WATER
+    state = battleship.TurnState(board)
+    assert state.hits == 0 and len(state.untargeted) == 29 and (0, 0) not in state.untargeted
+    for _ in range(40):
+        loc = (rng.randrange(6), rng.randrange(5))
+        battleship.fire_torpedo(board, loc, state)
+        assert state.hits == battleship.count_bumps(board)
+        assert sorted(state.untargeted.cells) == battleship.list_of_locations_for_bump(board)
+        assert all(state.untargeted.cells[i] == cell for cell, i in state.untargeted.index.items())
+
+
+def test_seeded_hidden_board_is_unchanged():
+    helper.seed(0)
+    assert battleship.hidden_board() == [
+        [0, 0, 1, 0, 0, 0, 0, 0],
+        [0, 0, 1, 0, 0, 0, 0, 0],
+        [0, 0, 1, 0, 0, 0, 0, 1],
+        [1, 0, 0, 0, 0, 0, 1, 1],
+        [1, 0, 0, 0, 0, 0, 1, 1],
+        [1, 0, 0, 0, 0, 1, 1, 1],
+        [1, 0, 0, 0, 0, 1, 1, 1],
+        [1, 0, 0, 0, 0, 0, 1, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+    ]
+
+
+def test_random_torpedo_target_uses_list_as_given():
+    cells = [(2, 1), (0, 3), (1, 1)]
+    helper.seed(4)
+    picked = [helper.choose_random_torpedo_target(None, cells) for _ in range(10)]
+    helper.seed(4)
+    assert picked == [random.choice(cells) for _ in range(10)]
+
+# -----------------------------
+#  Tests for the density targeting
+# -----------------------------
+def brute_force_density(view, ship_sizes):
+    rows, columns = len(view), len(view[0])
+    density = [[0.0] * columns for _ in range(rows)]
+    for size in ship_sizes:
+        for c in range(columns):
+            for r in range(rows - size + 1):
+                cells = [view[r + i][c] for i in range(size)]
+                if helper.HIT_WATER in cells:
+                    continue
+                for i in range(size):
+                    density[r + i][c] += helper.HIT_WEIGHT ** cells.count(helper.HIT_SHIP)
+    return density
+
+
+def test_density_targeter_incremental_matches_full():
+    board = battleship.init_board(9, 6)
+    for i in range(2, 6):
+        board[i][3] = helper.SHIP
+    view = battleship.init_board(9, 6)
+    state = battleship.TurnState(board)
+    helper.seed(1)
+    targeter = helper.DensityTargeter(view, (4, 3, 3, 2))
+    for _ in range(25):
+        target = targeter.choose(state.untargeted.cells)
+        assert target in state.untargeted
+        battleship.hit_point(view, board, *target)
+        battleship.fire_torpedo(board, target, state)
+    targeter.choose(state.untargeted.cells)
+    assert np.allclose(targeter.density, brute_force_density(view, (4, 3, 3, 2)))
+    assert np.allclose(targeter.density, helper.DensityTargeter(view, (4, 3, 3, 2)).density)
+
+
+def test_density_targeter_follows_up_hits():
+    view = battleship.init_board(10, 8)
+    view[4][2] = helper.HIT_SHIP
+    locations = battleship.list_of_locations_for_bump(view)
+    helper.seed(0)
+    assert helper.choose_torpedo_target(view, locations) in ((3, 2), (5, 2))
+
+
+def test_density_beats_random():
+    density = simulate.simulate(40, (simulate.DENSITY, simulate.RANDOM), workers=1)
+    assert density['wins'][0] > density['wins'][1]
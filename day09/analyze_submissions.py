@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """analyze_submissions.py
 
-Usage: python analyze_submissions.py [subjects.txt] [README.md]
+Usage: python analyze_submissions.py [subjects.txt] [README.md] [--aliases aliases.json] [--state state.json]
+                                      [--format text|jsonl|csv] [--output report.jsonl]
+       python analyze_submissions.py [subjects.txt] [README.md] --watch [--interval 0.1] [--metrics metrics.json]
+       python analyze_submissions.py --courses COURSES_DIR [--workers N] [--report-dir DIR]
 
 Generates a report with:
  1) Students that have not submitted certain assignments.
@@ -11,11 +14,38 @@ Generates a report with:
 Assumes every student is expected to submit all assignments listed in the README (Day01..Day09 and Final Project proposal).
 """
 from __future__ import annotations
+import argparse
+import csv
+import hashlib
+import json
+import os
 import re
 import sys
+import time
 from collections import defaultdict
-from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Day numbers ('Day 05', 'Day5', and 'and 06' when the second day has no 'Day') and the
+# final-project flag, as one alternation matched against the lower-cased title.
+_TITLE_TOKEN_RE = re.compile(r"day\s*0?(\d{1,2})|\band\s*0?(\d{1,2})\b|(final project proposal)")
+_DAY_RE = re.compile(r"Day\s*0?(\d{1,2})", re.I)
+_BY_NAME_RE = re.compile(r"\bby\s+(.+)$", re.I)
+_DASH_NAME_RE = re.compile(r"[-–]\s*(.+)$")
+_FILLER_RE = re.compile(r"(?i)\b(and|proposal|for|final project)\b")
+_ISO_PREFIX_RE = re.compile(r"\d{4}-\d{2}-\d{2}T")
+_NAME_PUNCT_RE = re.compile(r"[^\w\s]")
+
+# Columns of the structured (--format jsonl/csv) report, one record per student and assignment
+RECORD_FIELDS = ("section", "student", "assignment", "id", "submitted", "deadline")
+
+# Bumped whenever the layout of the --state snapshot changes; older snapshots are discarded
+STATE_VERSION = 1
+
+# Distinct titles whose parsed (assignments, student) are kept; the same titles repeat for every resubmission
+TITLE_CACHE_SIZE = 8192
 
 
 def parse_readme_deadlines(path: str) -> Dict[str, datetime]:
@@ -46,60 +76,211 @@ def parse_readme_deadlines(path: str) -> Dict[str, datetime]:
     return deadlines
 
 
-def parse_subjects(path: str) -> List[Dict]:
-    """Parse subjects.txt; returns list of dicts with keys: id, status, title, assignments (list), student, timestamp (datetime or None).
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Parsed rows share these instead of holding their own copies
+_ASSIGNMENT_TUPLES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _to_epoch_us(dt: Optional[datetime]) -> Optional[int]:
+    """Return dt as integer microseconds since the Unix epoch (naive datetimes are taken as UTC)."""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_epoch_us(epoch_us: Optional[int]) -> Optional[datetime]:
+    if epoch_us is None:
+        return None
+    return _EPOCH + timedelta(microseconds=epoch_us)
+
+
+class Submission:
+    """One parsed row of subjects.txt, stored compactly.
+
+    Uses __slots__ instead of a per-row dict, interns the title, student and
+    status strings, shares the assignments tuple between rows, and keeps the timestamp
+    as integer epoch microseconds (`epoch_us`), building the UTC datetime only
+    when `timestamp` is read. Rows can still be read like the old dicts
+    (`row["student"]`, `row.get("status")`), and `to_dict()` returns one.
+    """
+
+    __slots__ = ("id", "status", "title", "assignments", "student", "epoch_us")
+    KEYS = ("id", "status", "title", "assignments", "student", "timestamp")
+
+    def __init__(self, id: str, status: str, title: str, assignments, student: str, timestamp: Optional[datetime] = None) -> None:
+        assignments = tuple(assignments)
+        self.id = id
+        self.status = sys.intern(status)
+        self.title = sys.intern(title)
+        self.assignments = _ASSIGNMENT_TUPLES.setdefault(assignments, assignments)
+        self.student = sys.intern(student)
+        self.epoch_us = _to_epoch_us(timestamp)
+
+    @property
+    def timestamp(self) -> Optional[datetime]:
+        return _from_epoch_us(self.epoch_us)
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.KEYS
+
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self.KEYS}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Submission):
+            return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Submission({self.to_dict()!r})"
+
+
+def parse_subjects(path: str) -> List[Submission]:
+    """Parse subjects.txt; returns a list of `Submission` rows with keys: id, status, title, assignments, student, timestamp (datetime or None).
 
     This normalizes assignments to `DayNN` and attempts to robustly extract multi-day entries and student names in common formats.
     """
-    rows = []
-    final_re = re.compile(r"Final Project proposal", re.I)
+    return list(iter_subjects(path))
+
+
+def normalize_student_key(name: str) -> str:
+    """Return the key under which spellings of one student's name are merged.
+
+    Case, punctuation, a leading 'by' and extra whitespace are ignored, so
+    'Name', '- name' and 'by NAME' all give the same key.
+    """
+    words = _NAME_PUNCT_RE.sub(" ", name.casefold()).split()
+    if words and words[0] == "by":
+        words = words[1:]
+    return " ".join(words)
+
+
+class StudentAliasIndex:
+    """Maps normalized student keys to one canonical spelling of the name.
+
+    The first spelling seen for a key becomes the canonical one. The index can
+    be saved to and loaded from a JSON file so the same canonical names are
+    used across runs.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None) -> None:
+        self.aliases: Dict[str, str] = dict(aliases or {})
+
+    def canonical(self, name: str) -> str:
+        return self.aliases.setdefault(normalize_student_key(name), name)
+
+    @classmethod
+    def load(cls, path: str) -> "StudentAliasIndex":
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as fh:
+            return cls(json.load(fh))
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.aliases, fh, indent=1, sort_keys=True, ensure_ascii=False)
 
+
+def iter_subjects(path: str, aliases: Optional[StudentAliasIndex] = None) -> Iterator[Submission]:
+    """Lazily yield the rows of subjects.txt one at a time (same rows as `parse_subjects`).
+
+    Student names are merged through `aliases` (a fresh StudentAliasIndex by default).
+    """
+    aliases = aliases if aliases is not None else StudentAliasIndex()
     with open(path, encoding="utf-8") as fh:
         for raw in fh:
-            line = raw.strip()
-            if not line:
-                continue
-            parts = line.split("\t")
-            # expected parts: id, status, title, maybe blank, timestamp
-            _id = parts[0] if len(parts) > 0 else ""
-            status = parts[1] if len(parts) > 1 else ""
-            title = parts[2] if len(parts) > 2 else ""
-            timestamp = None
-            if len(parts) >= 5 and parts[4].strip():
-                ts = parts[4].strip()
-                timestamp = _parse_iso_z(ts)
-            elif len(parts) == 4 and parts[3].strip():
-                # sometimes timestamp is the 4th column
-                ts = parts[3].strip()
-                # if ts looks like ISO
-                if re.match(r"\d{4}-\d{2}-\d{2}T", ts):
-                    timestamp = _parse_iso_z(ts)
-
-            # find day numbers: 'Day 05', 'Day5' etc.
-            assignment_nums = set()
-            for n in re.findall(r"Day\s*0?(\d{1,2})", title, re.I):
-                assignment_nums.add(int(n))
-            # also catch 'and 06' style when second day doesn't include 'Day'
-            for n in re.findall(r"\band\s*0?(\d{1,2})\b", title, re.I):
-                assignment_nums.add(int(n))
-            assignments = [f"Day{num:02d}" for num in sorted(assignment_nums)]
-            if final_re.search(title):
-                assignments.append("Final Project proposal")
-
-            # student extraction: try several heuristics
-            student = _extract_student_from_title(title)
-            rows.append({
-                "id": _id,
-                "status": status,
-                "title": title,
-                "assignments": assignments,
-                "student": student,
-                "timestamp": timestamp,
-            })
-    return rows
+            row = _parse_line(raw, aliases)
+            if row is not None:
+                yield row
+
+
+def iter_appended_subjects(path: str, offset: int, aliases: StudentAliasIndex,
+                           include_tail: bool = False) -> Iterator[Tuple[Submission, int]]:
+    """Yield (row, end offset) for the complete lines of subjects.txt starting at byte offset.
+
+    A last line without its newline may still be being written, so it is
+    left alone unless include_tail is true; resuming from the last yielded
+    offset then never splits a row.
+    """
+    with open(path, "rb") as fh:
+        fh.seek(offset)
+        for raw in fh:
+            if not raw.endswith(b"\n") and not include_tail:
+                break
+            offset += len(raw)
+            row = _parse_line(raw.decode("utf-8"), aliases)
+            if row is not None:
+                yield row, offset
+
+
+def _parse_line(raw: str, aliases: StudentAliasIndex) -> Optional[Submission]:
+    line = raw.strip()
+    if not line:
+        return None
+    parts = line.split("\t")
+    # expected parts: id, status, title, maybe blank, timestamp
+    _id = parts[0] if len(parts) > 0 else ""
+    status = parts[1] if len(parts) > 1 else ""
+    title = parts[2] if len(parts) > 2 else ""
+    timestamp = None
+    if len(parts) >= 5 and parts[4].strip():
+        ts = parts[4].strip()
+        timestamp = _parse_iso_z(ts)
+    elif len(parts) == 4 and parts[3].strip():
+        # sometimes timestamp is the 4th column
+        ts = parts[3].strip()
+        # if ts looks like ISO
+        if _ISO_PREFIX_RE.match(ts):
+            timestamp = _parse_iso_z(ts)
+
+    assignments, student = _tokenize_title(title)
+    return Submission(_id, status, title, assignments, aliases.canonical(student), timestamp)
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def _tokenize_title(title: str) -> Tuple[Tuple[str, ...], str]:
+    """Return (assignments, student) for a submission title.
+
+    Day numbers and the final-project flag come from a single findall of
+    _TITLE_TOKEN_RE; the student name from the precompiled heuristics below.
+    Results are cached (bounded LRU), so a repeated title costs a dict lookup.
+    """
+    assignment_nums = set()
+    final = False
+    for day, and_day, final_token in _TITLE_TOKEN_RE.findall(title.lower()):
+        if final_token:
+            final = True
+        else:
+            assignment_nums.add(int(day or and_day))
+    assignments = [f"Day{num:02d}" for num in sorted(assignment_nums)]
+    if final:
+        assignments.append("Final Project proposal")
+    return tuple(assignments), _extract_student_from_title(title)
+
+
+# fromisoformat reads a trailing 'Z' itself from Python 3.11 on
+_FROMISOFORMAT_Z = sys.version_info >= (3, 11)
 
 
 def _parse_iso_z(s: str) -> datetime:
+    # fast path for the export's fixed-width 'YYYY-MM-DDTHH:MM:SSZ'
+    if len(s) == 20 and s[19] == "Z" and s[10] == "T":
+        try:
+            if _FROMISOFORMAT_Z:
+                return datetime.fromisoformat(s)
+            return datetime.fromisoformat(s[:19]).replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
     s = s.strip()
     # convert trailing Z to +00:00 for fromisoformat
     if s.endswith("Z"):
@@ -117,19 +298,20 @@ def _parse_iso_z(s: str) -> datetime:
 
 def _extract_student_from_title(title: str) -> str:
     # first try ' by NAME'
-    m = re.search(r"\bby\s+(.+)$", title, re.I)
+    m = _BY_NAME_RE.search(title)
     if m:
         student = m.group(1).strip()
         return student.title()
     # then try trailing -NAME (e.g., '-Name')
-    m = re.search(r"[-–]\s*(.+)$", title)
+    m = _DASH_NAME_RE.search(title)
     if m:
         student = m.group(1).strip()
         return student.title()
     # else try to take the remainder after the last 'Day..' occurrence
-    day_matches = list(re.finditer(r"Day\s*0?(\d{1,2})", title, re.I))
-    if day_matches:
-        last = day_matches[-1]
+    last = None
+    for last in _DAY_RE.finditer(title):
+        pass
+    if last is not None:
         remainder = title[last.end():].strip()
         # remove leading connectors and common words
         remainder = remainder.lstrip(" -:,")
@@ -137,7 +319,7 @@ def _extract_student_from_title(title: str) -> str:
         if "-" in remainder:
             remainder = remainder.split("-")[-1].strip()
         # remove common filler words
-        remainder = re.sub(r"(?i)\b(and|proposal|for|final project)\b", "", remainder)
+        remainder = _FILLER_RE.sub("", remainder)
         remainder = " ".join(remainder.split()).strip()
         if remainder:
             return remainder.title()
@@ -148,88 +330,567 @@ def _extract_student_from_title(title: str) -> str:
     return ""
 
 
-def analyze(deadlines: Dict[str, datetime], rows: List[Dict]) -> Tuple[Dict[str, List[str]], List[Dict], List[Dict]]:
-    """Returns: (missing_submissions: {student: [assignments]}, late_submissions: [dicts], open_submissions: [dicts])"""
-    expected_assignments = sorted([k for k in deadlines.keys()], key=lambda k: k)
-    # build set of students
-    students = set()
-    # map student->assignment->list of timestamps
-    subs = defaultdict(lambda: defaultdict(list))
-    open_subs = []
+class SubmissionAggregate:
+    """Per-student aggregates, folded in one row at a time.
 
-    for r in rows:
-        student = r["student"]
-        students.add(student)
-        if r["status"].upper() == "OPEN":
-            open_subs.append(r)
-        for assignment in r["assignments"]:
-            subs[student][assignment].append(r)
+    Keeps only what the report needs: the assignments each student submitted, the
+    earliest timestamp of their OPEN submissions per assignment, and the OPEN rows
+    themselves. Memory is proportional to students x assignments (plus OPEN rows),
+    not to the number of rows in the export.
+    """
 
-    missing: Dict[str, List[str]] = {}
-    late: List[Dict] = []
-
-    for student in sorted(students):
-        missing_list = []
-        for assignment in expected_assignments:
-            recs = subs[student].get(assignment, [])
-            if not recs:
-                missing_list.append(assignment)
-            else:
-                # find earliest timestamp among recs that have timestamp AND are still OPEN
-                ts_list = [r["timestamp"] for r in recs if r["timestamp"] and r.get("status", "").upper() == "OPEN"]
-                if not ts_list:
+    def __init__(self) -> None:
+        self.submitted: Dict[str, set] = defaultdict(set)
+        self.earliest_open: Dict[Tuple[str, str], int] = {}  # epoch microseconds
+        self.open_subs: List[Submission] = []
+
+    def add(self, row: Submission) -> None:
+        student = row.student
+        submitted = self.submitted[student]
+        is_open = row.status.upper() == "OPEN"
+        if is_open:
+            self.open_subs.append(row)
+        timestamp = row.epoch_us
+        for assignment in row.assignments:
+            submitted.add(assignment)
+            # only OPEN records with a timestamp can make a submission late
+            if is_open and timestamp is not None:
+                key = (student, assignment)
+                earliest = self.earliest_open.get(key)
+                if earliest is None or timestamp < earliest:
+                    self.earliest_open[key] = timestamp
+
+    def add_all(self, rows: Iterable[Submission]) -> "SubmissionAggregate":
+        for row in rows:
+            self.add(row)
+        return self
+
+    def to_state(self) -> Dict:
+        """Return the aggregate as JSON-serializable data (see `from_state`)."""
+        return {
+            "submitted": {student: sorted(assignments) for student, assignments in self.submitted.items()},
+            "earliest_open": [[student, assignment, epoch_us]
+                              for (student, assignment), epoch_us in self.earliest_open.items()],
+            "open_subs": [[r.id, r.status, r.title, list(r.assignments), r.student, r.epoch_us]
+                          for r in self.open_subs],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "SubmissionAggregate":
+        aggregate = cls()
+        for student, assignments in state["submitted"].items():
+            aggregate.submitted[student].update(assignments)
+        for student, assignment, epoch_us in state["earliest_open"]:
+            aggregate.earliest_open[(student, assignment)] = epoch_us
+        for _id, status, title, assignments, student, epoch_us in state["open_subs"]:
+            aggregate.open_subs.append(Submission(_id, status, title, assignments, student, _from_epoch_us(epoch_us)))
+        return aggregate
+
+    def results(self, deadlines: Dict[str, datetime]) -> Tuple[Dict[str, List[str]], List[Dict], List[Submission]]:
+        """Returns: (missing_submissions: {student: [assignments]}, late_submissions: [dicts], open_submissions: [dicts])"""
+        expected_assignments = sorted(deadlines.keys())
+        missing: Dict[str, List[str]] = {}
+        late: List[Dict] = []
+        for student in sorted(self.submitted):
+            submitted = self.submitted[student]
+            missing_list = []
+            for assignment in expected_assignments:
+                if assignment not in submitted:
+                    missing_list.append(assignment)
+                    continue
+                earliest = self.earliest_open.get((student, assignment))
+                if earliest is None:
                     # either no timestamp or no OPEN record -> do not mark as late
                     continue
-                earliest = min(ts_list)
                 deadline = deadlines.get(assignment)
-                if deadline and earliest > deadline:
+                if deadline and earliest > _to_epoch_us(deadline):
                     late.append({
                         "student": student,
                         "assignment": assignment,
-                        "submitted": earliest,
+                        "submitted": _from_epoch_us(earliest),
                         "deadline": deadline,
                     })
-        if missing_list:
-            missing[student] = missing_list
+            if missing_list:
+                missing[student] = missing_list
+        return missing, late, self.open_subs
+
+
+def analyze(deadlines: Dict[str, datetime], rows: Iterable[Submission]) -> Tuple[Dict[str, List[str]], List[Dict], List[Submission]]:
+    """Returns: (missing_submissions: {student: [assignments]}, late_submissions: [dicts], open_submissions: [dicts])
+
+    rows may be any iterable (e.g. `iter_subjects`); it is consumed once.
+    """
+    return SubmissionAggregate().add_all(rows).results(deadlines)
+
+
+def analyze_columnar(deadlines: Dict[str, datetime], rows: Iterable[Submission]) -> Tuple[Dict[str, List[str]], List[Dict], List[Submission]]:
+    """Same results as `analyze`, computed on NumPy columns instead of per-student loops.
+
+    One pass over the rows fills int64 columns (student code, assignment-set
+    code, OPEN timestamp as epoch microseconds); the rows are then exploded to
+    one cell per (student, assignment) with np.repeat, the earliest OPEN
+    timestamp per cell is a grouped minimum (np.minimum.at), and the missing
+    and late cells come from comparing the students x assignments matrices
+    with the deadline vector.
+
+    It is not faster than `analyze` (the pass over the rows dominates both)
+    and is kept as a cross-check of it. NumPy is imported here, so only this
+    function needs it.
+    """
+    import numpy as np
+
+    student_codes: Dict[str, int] = {}
+    set_codes: Dict[Tuple[str, ...], int] = {}
+    row_students: List[int] = []
+    row_sets: List[int] = []
+    row_open_us: List[int] = []
+    open_subs: List[Submission] = []
+    no_time = np.iinfo(np.int64).max
+    for row in rows:
+        row_students.append(student_codes.setdefault(row.student, len(student_codes)))
+        row_sets.append(set_codes.setdefault(row.assignments, len(set_codes)))
+        if row.status.upper() == "OPEN":
+            open_subs.append(row)
+            row_open_us.append(no_time if row.epoch_us is None else row.epoch_us)
+        else:
+            row_open_us.append(no_time)
+
+    names = sorted(deadlines)
+    assignment_codes = {a: i for i, a in enumerate(names)}
+    for assignments in set_codes:
+        for assignment in assignments:
+            assignment_codes.setdefault(assignment, len(assignment_codes))
+    # assignment codes of every assignment set, concatenated, with offsets and lengths per set
+    set_lengths = np.array([len(a) for a in set_codes], dtype=np.int64)
+    set_members = np.array([assignment_codes[x] for a in set_codes for x in a], dtype=np.int64)
+    set_starts = np.cumsum(set_lengths) - set_lengths
+
+    students = sorted(student_codes)
+    # renumber students so matrix rows come out in sorted order, like `analyze`
+    order = np.empty(len(students), dtype=np.int64)
+    order[[student_codes[name] for name in students]] = np.arange(len(students))
+    row_sets = np.asarray(row_sets, dtype=np.int64)
+    per_row = set_lengths[row_sets]
+    # position of each exploded cell within its row's assignment set
+    within = np.arange(per_row.sum()) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+    cell_assignments = set_members[np.repeat(set_starts[row_sets], per_row) + within]
+    cell_students = np.repeat(order[np.asarray(row_students, dtype=np.int64)], per_row)
+    cell_open_us = np.repeat(np.asarray(row_open_us, dtype=np.int64), per_row)
+
+    shape = (len(students), len(assignment_codes))
+    cells = cell_students * shape[1] + cell_assignments
+    submitted = np.zeros(shape, dtype=bool)
+    submitted.flat[cells] = True
+    earliest = np.full(shape, no_time, dtype=np.int64)
+    np.minimum.at(earliest.reshape(-1), cells, cell_open_us)
+
+    submitted = submitted[:, :len(names)]
+    earliest = earliest[:, :len(names)]
+    deadline_us = np.array([_to_epoch_us(deadlines[a]) for a in names], dtype=np.int64)
+    is_late = submitted & (earliest != no_time) & (earliest > deadline_us)
+
+    missing: Dict[str, List[str]] = {}
+    for s, a in zip(*np.nonzero(~submitted)):
+        missing.setdefault(students[s], []).append(names[a])
+    late = [{
+        "student": students[s],
+        "assignment": names[a],
+        "submitted": _from_epoch_us(int(earliest[s, a])),
+        "deadline": deadlines[names[a]],
+    } for s, a in zip(*np.nonzero(is_late))]
     return missing, late, open_subs
 
 
-def format_report(missing: Dict[str, List[str]], late: List[Dict], open_subs: List[Dict]) -> str:
-    lines = []
-    lines.append("REPORT\n" + "=" * 40)
-    lines.append("\n1) Students missing submissions:\n")
+def _file_sha256(path: str) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+class SubmissionWatcher:
+    """Keeps the analysis of one subjects.txt / README.md pair up to date as the files change.
+
+    `refresh()` stats both files and only does work for what changed: the
+    README is re-parsed when its mtime and hash both changed, and only the
+    complete lines appended to subjects.txt since the last refresh are parsed
+    (from the start again if the file shrank or was replaced). The position
+    reached can be saved with `to_state()` and resumed with `state=`.
+
+    A last line without a newline is parsed once the file size has stayed the
+    same for one refresh (or at once with `refresh(tail=True)`). If more text
+    is later appended to that same line, the file is parsed again from the start.
+
+    A file that cannot be read (e.g. briefly missing while an editor or log
+    rotation replaces it) counts as no change and is retried on the next
+    refresh, so `watch()` keeps running. A README without deadlines (e.g.
+    truncated by an editor before it is rewritten) is treated the same way:
+    the previous deadlines are kept.
+
+    `metrics` counts refreshes, updates, parsed rows and file errors, and records the
+    parse time of the last update and the latency from the newest file
+    modification to the updated results (both in milliseconds; the first
+    refresh, which reads files changed at any time before, has no latency).
+    """
+
+    def __init__(self, subjects_path: str, readme_path: str,
+                 aliases: Optional[StudentAliasIndex] = None, state: Optional[Dict] = None) -> None:
+        self.subjects_path = subjects_path
+        self.readme_path = readme_path
+        if state is not None and state.get("version") != STATE_VERSION:
+            state = None
+        self.readme: Optional[Dict] = state["readme"] if state else None
+        self.subjects: Optional[Dict] = state["subjects"] if state else None
+        self.aggregate = SubmissionAggregate.from_state(state["aggregate"]) if state else SubmissionAggregate()
+        if aliases is None:
+            aliases = StudentAliasIndex(state["aliases"] if state else None)
+        self.aliases = aliases
+        self.deadlines: Dict[str, datetime] = {}
+        if self.readme is not None:
+            self.deadlines = {k: datetime.fromisoformat(v) for k, v in self.readme["deadlines"].items()}
+        self.metrics: Dict[str, float] = {
+            "refreshes": 0, "updates": 0, "readme_parses": 0, "rows_parsed": 0, "file_errors": 0,
+            "last_parse_ms": 0.0, "total_parse_ms": 0.0, "last_latency_ms": 0.0, "max_latency_ms": 0.0,
+        }
+        # set when the results changed but a later file error kept refresh() from reporting it
+        self._changed = False
+
+    def refresh(self, strict: bool = False, tail: bool = False) -> bool:
+        """Pick up changes to both files; returns True if the results may have changed.
+
+        An OSError while reading the files, or a ValueError for a README without
+        deadlines, is counted in metrics["file_errors"] and treated as no
+        change, unless strict is true, when it is raised.
+        With tail true, a last line without a newline is parsed right away.
+        """
+        self.metrics["refreshes"] += 1
+        try:
+            return self._refresh(tail)
+        except (OSError, ValueError):
+            if strict:
+                raise
+            self.metrics["file_errors"] += 1
+            return False
+
+    def _refresh(self, tail: bool) -> bool:
+        start = time.perf_counter()
+        changed = self._changed
+        readme_stat = os.stat(self.readme_path)
+        if self.readme is None or self.readme["mtime_ns"] != readme_stat.st_mtime_ns:
+            sha256 = _file_sha256(self.readme_path)
+            if self.readme is None or self.readme["sha256"] != sha256:
+                deadlines = parse_readme_deadlines(self.readme_path)
+                if not deadlines:
+                    # left unrecorded, so the README is read again on the next refresh
+                    raise ValueError(f"no deadlines parsed from {self.readme_path}")
+                self.deadlines = deadlines
+                self.readme = {"deadlines": {k: v.isoformat() for k, v in deadlines.items()}, "sha256": sha256}
+                self.metrics["readme_parses"] += 1
+                changed = self._changed = True
+            self.readme["mtime_ns"] = readme_stat.st_mtime_ns
+
+        subjects_stat = os.stat(self.subjects_path)
+        size = subjects_stat.st_size
+        if (self.subjects is None or self.subjects["inode"] != subjects_stat.st_ino
+                or size < self.subjects["offset"] or self._tail_continued(size)):
+            self.subjects = {"inode": subjects_stat.st_ino, "offset": 0}
+            self.aggregate = SubmissionAggregate()
+            changed = self._changed = True
+        if size > self.subjects["offset"]:
+            include_tail = tail or self.subjects.get("size") == size
+            for row, offset in iter_appended_subjects(self.subjects_path, self.subjects["offset"], self.aliases,
+                                                      include_tail):
+                self.aggregate.add(row)
+                # kept per row, so an error part way through does not add these rows twice
+                self.subjects["offset"] = offset
+                self.metrics["rows_parsed"] += 1
+                changed = self._changed = True
+            self.subjects["tail_open"] = include_tail and self.subjects["offset"] == size and self._last_byte() != b"\n"
+        self.subjects["size"] = size
+
+        self._changed = False
+        if changed:
+            parse_ms = (time.perf_counter() - start) * 1000
+            self.metrics["updates"] += 1
+            self.metrics["last_parse_ms"] = parse_ms
+            self.metrics["total_parse_ms"] += parse_ms
+            if self.metrics["refreshes"] > 1:
+                newest_ns = max(readme_stat.st_mtime_ns, subjects_stat.st_mtime_ns)
+                latency_ms = max(0.0, (time.time_ns() - newest_ns) / 1e6)
+                self.metrics["last_latency_ms"] = latency_ms
+                self.metrics["max_latency_ms"] = max(self.metrics["max_latency_ms"], latency_ms)
+        return changed
+
+    def _last_byte(self) -> bytes:
+        with open(self.subjects_path, "rb") as fh:
+            fh.seek(self.subjects["offset"] - 1)
+            return fh.read(1)
+
+    def _tail_continued(self, size: int) -> bool:
+        """True if text was appended to a last line that was parsed without its newline."""
+        if not self.subjects.get("tail_open") or size <= self.subjects["offset"]:
+            return False
+        with open(self.subjects_path, "rb") as fh:
+            fh.seek(self.subjects["offset"])
+            return fh.read(1) not in (b"\n", b"\r")
+
+    def results(self) -> Tuple[Dict[str, List[str]], List[Dict], List[Submission]]:
+        return self.aggregate.results(self.deadlines)
+
+    def to_state(self) -> Dict:
+        return {"version": STATE_VERSION, "readme": self.readme, "subjects": self.subjects,
+                "aggregate": self.aggregate.to_state(), "aliases": self.aliases.aliases}
+
+    def watch(self, on_update, interval: float = 0.1, max_updates: Optional[int] = None) -> None:
+        """Poll the files every interval seconds and call on_update(self) after each change.
+
+        Runs until interrupted, or until max_updates updates have been reported.
+        """
+        updates = 0
+        while max_updates is None or updates < max_updates:
+            if self.refresh():
+                on_update(self)
+                updates += 1
+            else:
+                time.sleep(interval)
+
+
+def _load_state(state_path: str) -> Optional[Dict]:
+    """Return the snapshot saved in state_path, or None if there is none yet."""
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def analyze_incremental(subjects_path: str, readme_path: str, state_path: str,
+                        aliases: Optional[StudentAliasIndex] = None):
+    """Like `analyze`, but resumes from the snapshot in state_path and only parses rows appended since.
+
+    The snapshot holds the byte offset reached in subjects_path, the README's
+    mtime, hash and deadlines, the SubmissionAggregate and the student aliases
+    (see `SubmissionWatcher`); it is rewritten after every call. Without a
+    snapshot (or with an outdated one) this is a full analysis. `aliases`
+    defaults to the aliases in the snapshot.
+
+    Returns (missing, late, open_subs) like `analyze`; raises ValueError (and
+    leaves the snapshot alone) if the README has no deadlines.
+    """
+    watcher = SubmissionWatcher(subjects_path, readme_path, aliases, _load_state(state_path))
+    # a one-shot run takes the file as it is now, like a full run, including a last line without a newline
+    watcher.refresh(strict=True, tail=True)
+    if not watcher.deadlines:
+        raise ValueError(f"no deadlines parsed from {readme_path}")
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(watcher.to_state(), fh, ensure_ascii=False)
+    os.replace(tmp_path, state_path)
+    return watcher.results()
+
+
+def iter_records(missing: Dict[str, List[str]], late: List[Dict], open_subs: List[Submission]) -> Iterator[Dict]:
+    """Yield the report as flat records (keys RECORD_FIELDS), in the order of the text report.
+
+    Section is 'missing', 'late' or 'open'; an OPEN row with several
+    assignments gives one record per assignment. Timestamps are ISO strings,
+    and fields that do not apply to a section are None.
+    """
+    for student, assigns in sorted(missing.items()):
+        for assignment in assigns:
+            yield {"section": "missing", "student": student, "assignment": assignment,
+                   "id": None, "submitted": None, "deadline": None}
+    for item in sorted(late, key=lambda x: (x['student'], x['assignment'])):
+        yield {"section": "late", "student": item["student"], "assignment": item["assignment"], "id": None,
+               "submitted": item["submitted"].isoformat(), "deadline": item["deadline"].isoformat()}
+    for r in open_subs:
+        submitted = r.timestamp.isoformat() if r.epoch_us is not None else None
+        for assignment in r.assignments:
+            yield {"section": "open", "student": r.student, "assignment": assignment,
+                   "id": r.id, "submitted": submitted, "deadline": None}
+
+
+def write_records(records: Iterable[Dict], output_format: str = "jsonl", out=None) -> None:
+    """Stream records to out as JSON lines or as CSV with a header line (empty cells for None)."""
+    out = out or sys.stdout
+    if output_format == "jsonl":
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return
+    writer = csv.DictWriter(out, fieldnames=RECORD_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+
+
+def iter_report_lines(missing: Dict[str, List[str]], late: List[Dict], open_subs: List[Submission]) -> Iterator[str]:
+    """Yield the lines of the text report one at a time (see `format_report`)."""
+    yield "REPORT\n" + "=" * 40
+    yield "\n1) Students missing submissions:\n"
     if not missing:
-        lines.append("All students submitted every expected assignment.\n")
+        yield "All students submitted every expected assignment.\n"
     else:
         for student, assigns in sorted(missing.items()):
-            lines.append(f"- {student}: {', '.join(assigns)}")
-    lines.append("\n2) Students who submitted after the deadline:\n")
+            yield f"- {student}: {', '.join(assigns)}"
+    yield "\n2) Students who submitted after the deadline:\n"
     if not late:
-        lines.append("No late submissions detected.\n")
+        yield "No late submissions detected.\n"
     else:
         for item in sorted(late, key=lambda x: (x['student'], x['assignment'])):
-            lines.append(f"- {item['student']} - {item['assignment']}: submitted {item['submitted'].isoformat()} (deadline {item['deadline'].isoformat()})")
-    lines.append("\n3) Submissions currently OPEN:\n")
+            yield f"- {item['student']} - {item['assignment']}: submitted {item['submitted'].isoformat()} (deadline {item['deadline'].isoformat()})"
+    yield "\n3) Submissions currently OPEN:\n"
     if not open_subs:
-        lines.append("No OPEN submissions.\n")
+        yield "No OPEN submissions.\n"
     else:
         for r in open_subs:
-            ts = r['timestamp'].isoformat() if r['timestamp'] else 'no timestamp'
-            lines.append(f"- id {r['id']} - {', '.join(r['assignments'])} - {r['student']} - {ts}")
-    return "\n".join(lines)
+            ts = r.timestamp.isoformat() if r.epoch_us is not None else 'no timestamp'
+            yield f"- id {r.id} - {', '.join(r.assignments)} - {r.student} - {ts}"
 
 
-def main(argv=sys.argv[1:]):
-    subjects_path = argv[0] if len(argv) >= 1 else "subjects.txt"
-    readme_path = argv[1] if len(argv) >= 2 else "README.md"
-    deadlines = parse_readme_deadlines(readme_path)
+def write_report(missing: Dict[str, List[str]], late: List[Dict], open_subs: List[Submission],
+                 output_format: str = "text", out=None) -> None:
+    """Stream the report to out as text (like `format_report`), JSON lines or CSV."""
+    out = out or sys.stdout
+    if output_format == "text":
+        for line in iter_report_lines(missing, late, open_subs):
+            out.write(line + "\n")
+    else:
+        write_records(iter_records(missing, late, open_subs), output_format, out)
+
+
+def format_report(missing: Dict[str, List[str]], late: List[Dict], open_subs: List[Submission]) -> str:
+    return "\n".join(iter_report_lines(missing, late, open_subs))
+
+
+def find_courses(courses_dir: str) -> List[str]:
+    """Return the sorted sub-directories of courses_dir that hold both a subjects.txt and a README.md."""
+    courses = []
+    for name in sorted(os.listdir(courses_dir)):
+        path = os.path.join(courses_dir, name)
+        if os.path.isfile(os.path.join(path, "subjects.txt")) and os.path.isfile(os.path.join(path, "README.md")):
+            courses.append(path)
+    return courses
+
+
+def analyze_course(course_dir: str) -> Tuple[str, Optional[str], Dict[str, int]]:
+    """Analyze one course folder; returns (course name, report or None if no deadlines, counts)."""
+    name = os.path.basename(os.path.normpath(course_dir))
+    deadlines = parse_readme_deadlines(os.path.join(course_dir, "README.md"))
     if not deadlines:
-        print("No deadlines parsed from README.md. Exiting.")
-        return 1
-    rows = parse_subjects(subjects_path)
-    missing, late, open_subs = analyze(deadlines, rows)
-    report = format_report(missing, late, open_subs)
-    print(report)
+        return name, None, {}
+    missing, late, open_subs = analyze(deadlines, iter_subjects(os.path.join(course_dir, "subjects.txt")))
+    counts = {"missing": sum(len(assigns) for assigns in missing.values()), "late": len(late), "open": len(open_subs)}
+    return name, format_report(missing, late, open_subs), counts
+
+
+def analyze_courses(courses_dir: str, report_dir: Optional[str] = None, workers: Optional[int] = None) -> str:
+    """Analyze every course under courses_dir in a process pool and return the combined report.
+
+    Courses are independent, so the wall time is close to that of the slowest
+    one. Each course's report is written to report_dir/courses/<course>.txt
+    (a folder of its own, so no course name can clash with the combined
+    report) and the combined report to report_dir/combined.txt (report_dir
+    defaults to courses_dir/reports).
+    """
+    report_dir = report_dir or os.path.join(courses_dir, "reports")
+    courses = find_courses(courses_dir)
+    course_report_dir = os.path.join(report_dir, "courses")
+    os.makedirs(course_report_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(analyze_course, courses))
+    summary = [f"COMBINED REPORT ({len(results)} courses)", "=" * 40, "",
+               f"{'course':<30}{'missing':>8}{'late':>6}{'open':>6}"]
+    sections = []
+    for name, report, counts in results:
+        if report is None:
+            summary.append(f"{name:<30}  no deadlines parsed from README.md")
+            continue
+        summary.append(f"{name:<30}{counts['missing']:>8}{counts['late']:>6}{counts['open']:>6}")
+        with open(os.path.join(course_report_dir, f"{name}.txt"), "w", encoding="utf-8") as fh:
+            fh.write(report + "\n")
+        sections.append(f"\n\n### {name}\n\n{report}")
+    combined = "\n".join(summary) + "".join(sections)
+    with open(os.path.join(report_dir, "combined.txt"), "w", encoding="utf-8") as fh:
+        fh.write(combined + "\n")
+    return combined
+
+
+def _write_output(results, output_format: str, output: Optional[str]) -> None:
+    """Write the report to output (replacing it in one step) or to standard output."""
+    if not output:
+        write_report(*results, output_format)
+        return
+    tmp_path = output + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+        write_report(*results, output_format, out)
+    os.replace(tmp_path, output)
+
+
+def _write_json(data, path: str) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+    os.replace(tmp_path, path)
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(description="Report missing, late and OPEN submissions.")
+    parser.add_argument("subjects", nargs="?", default="subjects.txt")
+    parser.add_argument("readme", nargs="?", default="README.md")
+    parser.add_argument("--aliases", help="JSON file of student name aliases, loaded and updated on every run")
+    parser.add_argument("--state", help="JSON snapshot file; when given only rows appended since the last run are parsed "
+                                        "(in --watch mode it is resumed from and rewritten after every update)")
+    parser.add_argument("--format", choices=("text", "jsonl", "csv"), default="text",
+                        help="text report, or one JSON line / CSV row per student and assignment (default: text)")
+    parser.add_argument("--output", help="write the report to this file instead of standard output")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and rewrite the report whenever subjects.txt or README.md change")
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between checks in --watch mode (default: 0.1)")
+    parser.add_argument("--metrics", help="in --watch mode, JSON file rewritten with the watcher counters after every update")
+    parser.add_argument("--courses", help="directory of course folders (each with subjects.txt and README.md) to analyze in parallel")
+    parser.add_argument("--workers", type=int, help="processes for --courses (default: one per CPU)")
+    parser.add_argument("--report-dir", help="where --courses writes per-course and combined reports (default: COURSES/reports)")
+    args = parser.parse_args(argv)
+    if args.courses:
+        print(analyze_courses(args.courses, args.report_dir, args.workers))
+        return 0
+    if args.watch:
+        aliases = StudentAliasIndex.load(args.aliases) if args.aliases else None
+        watcher = SubmissionWatcher(args.subjects, args.readme, aliases, _load_state(args.state) if args.state else None)
+
+        def on_update(watcher):
+            results = watcher.results()
+            _write_output(results, args.format, args.output)
+            if args.aliases:
+                watcher.aliases.save(args.aliases)
+            if args.state:
+                _write_json(watcher.to_state(), args.state)
+            if args.metrics:
+                _write_json(watcher.metrics, args.metrics)
+            missing, late, open_subs = results
+            print(f"updated: {sum(map(len, missing.values()))} missing, {len(late)} late, {len(open_subs)} open "
+                  f"(parse {watcher.metrics['last_parse_ms']:.1f} ms, latency {watcher.metrics['last_latency_ms']:.1f} ms)",
+                  file=sys.stderr)
+
+        try:
+            watcher.watch(on_update, args.interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.state:
+        aliases = StudentAliasIndex.load(args.aliases) if args.aliases else None
+        try:
+            missing, late, open_subs = analyze_incremental(args.subjects, args.readme, args.state, aliases)
+        except ValueError:
+            print("No deadlines parsed from README.md. Exiting.")
+            return 1
+    else:
+        deadlines = parse_readme_deadlines(args.readme)
+        if not deadlines:
+            print("No deadlines parsed from README.md. Exiting.")
+            return 1
+        aliases = StudentAliasIndex.load(args.aliases) if args.aliases else StudentAliasIndex()
+        missing, late, open_subs = analyze(deadlines, iter_subjects(args.subjects, aliases))
+    if args.aliases:
+        aliases.save(args.aliases)
+    _write_output((missing, late, open_subs), args.format, args.output)
     return 0
 
 
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""benchmark_parse.py
+
+Usage: python benchmark_parse.py [subjects.txt] [--rows N]
+
+Builds a large synthetic export by repeating the titles of subjects.txt with
+many different student names, then times the precompiled title tokenizer used
+by `parse_subjects` against the previous multi-regex implementation (kept
+below as a reference), both for whole-file parsing and for the title
+tokenizing alone, and checks that both give identical rows. The timestamp
+parser `_parse_iso_z` is timed the same way against its previous version,
+on timestamps that are all different.
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import analyze_submissions as subs
+
+
+# --- reference: the multi-regex parser that parse_subjects used before the tokenizer ---
+
+def legacy_extract_student_from_title(title: str) -> str:
+    m = re.search(r"\bby\s+(.+)$", title, re.I)
+    if m:
+        return m.group(1).strip().title()
+    m = re.search(r"[-–]\s*(.+)$", title)
+    if m:
+        return m.group(1).strip().title()
+    day_matches = list(re.finditer(r"Day\s*0?(\d{1,2})", title, re.I))
+    if day_matches:
+        remainder = title[day_matches[-1].end():].strip()
+        remainder = remainder.lstrip(" -:,")
+        if "-" in remainder:
+            remainder = remainder.split("-")[-1].strip()
+        remainder = re.sub(r"(?i)\b(and|proposal|for|final project)\b", "", remainder)
+        remainder = " ".join(remainder.split()).strip()
+        if remainder:
+            return remainder.title()
+    parts = title.split()
+    if parts:
+        return parts[-1].title()
+    return ""
+
+
+def legacy_tokenize_title(title: str):
+    assignment_nums = set()
+    for n in re.findall(r"Day\s*0?(\d{1,2})", title, re.I):
+        assignment_nums.add(int(n))
+    for n in re.findall(r"\band\s*0?(\d{1,2})\b", title, re.I):
+        assignment_nums.add(int(n))
+    assignments = [f"Day{num:02d}" for num in sorted(assignment_nums)]
+    if re.search(r"Final Project proposal", title, re.I):
+        assignments.append("Final Project proposal")
+    return assignments, legacy_extract_student_from_title(title)
+
+
+def legacy_parse_iso_z(s: str) -> datetime:
+    s = s.strip()
+    if s.endswith("Z"):
+        s = s[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(s)
+    except Exception:
+        try:
+            dt = datetime.strptime(s, "%Y-%m-%dT%H:%M:%S%z")
+        except Exception:
+            dt = None
+    return dt
+
+
+def legacy_parse_subjects(path: str) -> List[Dict]:
+    rows = []
+    with open(path, encoding="utf-8") as fh:
+        for raw in fh:
+            line = raw.strip()
+            if not line:
+                continue
+            parts = line.split("\t")
+            _id = parts[0] if len(parts) > 0 else ""
+            status = parts[1] if len(parts) > 1 else ""
+            title = parts[2] if len(parts) > 2 else ""
+            timestamp = None
+            if len(parts) >= 5 and parts[4].strip():
+                timestamp = legacy_parse_iso_z(parts[4].strip())
+            elif len(parts) == 4 and parts[3].strip():
+                ts = parts[3].strip()
+                if re.match(r"\d{4}-\d{2}-\d{2}T", ts):
+                    timestamp = legacy_parse_iso_z(ts)
+            assignments, student = legacy_tokenize_title(title)
+            rows.append({
+                "id": _id,
+                "status": status,
+                "title": title,
+                "assignments": assignments,
+                "student": student,
+                "timestamp": timestamp,
+            })
+    return rows
+
+
+def as_submissions(rows: List[Dict]) -> List[subs.Submission]:
+    """Turn reference rows into Submission rows, merging student aliases as parse_subjects does."""
+    aliases = subs.StudentAliasIndex()
+    return [subs.Submission(r["id"], r["status"], r["title"], r["assignments"], aliases.canonical(r["student"]),
+                            r["timestamp"]) for r in rows]
+
+
+# --- synthetic export ---
+
+FIRST = ["Noa", "Adi", "Guy", "Lior", "Yael", "Omer", "Tamar", "Itai", "Maya", "Eden"]
+LAST = ["Levi", "Cohen", "Mizrahi", "Peretz", "Biton", "Dahan", "Avraham", "Friedman", "Katz", "Shapiro"]
+
+
+def write_synthetic_subjects(source: str, path: str, rows: int, seed: int = 0) -> None:
+    """Write rows lines shaped like source, with the student names replaced at random."""
+    rng = random.Random(seed)
+    with open(source, encoding="utf-8") as fh:
+        templates = [line.rstrip("\n").split("\t") for line in fh if line.strip()]
+    with open(path, "w", encoding="utf-8") as out:
+        for i in range(rows):
+            parts = list(rng.choice(templates))
+            name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+            title = parts[2]
+            for sep in (" by ", " By ", " - "):
+                if sep in title:
+                    title = title.split(sep)[0] + sep + name
+                    break
+            parts[0] = str(i)
+            parts[2] = title
+            out.write("\t".join(parts) + "\n")
+
+
+def synthetic_timestamps(count: int, seed: int = 0) -> List[str]:
+    """Return count distinct-looking 'YYYY-MM-DDTHH:MM:SSZ' strings spread over about four months."""
+    rng = random.Random(seed)
+    start = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    return [(start + timedelta(seconds=rng.randrange(10_000_000))).strftime("%Y-%m-%dT%H:%M:%SZ")
+            for _ in range(count)]
+
+
+def best_of(func, *args, repeat: int = 3, setup=None) -> float:
+    """Return the fastest of repeat calls of func(*args); setup() runs untimed before each call."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Benchmark parse_subjects.")
+    parser.add_argument("subjects", nargs="?", default=os.path.join(here, "subjects.txt"))
+    parser.add_argument("--rows", type=int, default=200_000, help="rows in the synthetic export (default: 200000)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "subjects.txt")
+        write_synthetic_subjects(args.subjects, path, args.rows)
+        assert subs.parse_subjects(path) == as_submissions(legacy_parse_subjects(path)), "tokenizer and reference disagree"
+        legacy = best_of(legacy_parse_subjects, path)
+        # the title cache is emptied before each run, so every run starts cold like a real one
+        current = best_of(subs.parse_subjects, path, setup=subs._tokenize_title.cache_clear)
+        with open(path, encoding="utf-8") as fh:
+            titles = [line.split("\t")[2] for line in fh]
+    legacy_titles = best_of(lambda: [legacy_tokenize_title(t) for t in titles])
+    uncached_titles = best_of(lambda: [subs._tokenize_title.__wrapped__(t) for t in titles])
+    cached_titles = best_of(lambda: [subs._tokenize_title(t) for t in titles], setup=subs._tokenize_title.cache_clear)
+    print(f"{args.rows} rows (best of 3)         previous    current  speedup")
+    print(f"  parse_subjects (whole file)  {legacy:9.3f} s {current:8.3f} s  {legacy / current:6.2f}x")
+    print(f"  title tokenizing only        {legacy_titles:9.3f} s {uncached_titles:8.3f} s  {legacy_titles / uncached_titles:6.2f}x")
+    print(f"    with the title cache       {legacy_titles:9.3f} s {cached_titles:8.3f} s  {legacy_titles / cached_titles:6.2f}x")
+    stamps = synthetic_timestamps(args.rows)
+    assert [subs._parse_iso_z(t) for t in stamps] == [legacy_parse_iso_z(t) for t in stamps], "timestamp parsers disagree"
+    legacy_stamps = best_of(lambda: [legacy_parse_iso_z(t) for t in stamps])
+    current_stamps = best_of(lambda: [subs._parse_iso_z(t) for t in stamps])
+    print(f"  _parse_iso_z only            {legacy_stamps:9.3f} s {current_stamps:8.3f} s  {legacy_stamps / current_stamps:6.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,31 @@
+import csv
+import io
+import json
 import os
-from day09.analyze_submissions import parse_readme_deadlines, parse_subjects, analyze
+import shutil
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from day09.analyze_submissions import (
+    RECORD_FIELDS,
+    StudentAliasIndex,
+    Submission,
+    SubmissionWatcher,
+    _parse_iso_z,
+    _tokenize_title,
+    analyze,
+    analyze_columnar,
+    analyze_courses,
+    analyze_incremental,
+    format_report,
+    iter_subjects,
+    main,
+    normalize_student_key,
+    parse_readme_deadlines,
+    parse_subjects,
+    write_report,
+)
 
 
 def test_basic_run():
@@ -18,3 +44,292 @@ def test_basic_run():
     for item in late:
         matches = [r for r in rows if r['status'].upper() == 'OPEN' and r['student'] == item['student'] and item['assignment'] in r['assignments']]
         assert matches, f"late entry not found in open rows: {item}"
+
+
+def test_tokenize_title():
+    assert _tokenize_title("Day 05 and 06 by Einav Litvak") == (("Day05", "Day06"), "Einav Litvak")
+    assert _tokenize_title("Day03 and Day04 by Einav Litvak") == (("Day03", "Day04"), "Einav Litvak")
+    assert _tokenize_title("DAY02 by Yana Lerner") == (("Day02",), "Yana Lerner")
+    assert _tokenize_title("Day 03 - Sriashwin Sridharan") == (("Day03",), "Sriashwin Sridharan")
+    assert _tokenize_title("Day 1 Lior Batat") == (("Day01",), "Lior Batat")
+    assert _tokenize_title("Final Project proposal by Achinoam Shoham") == (("Final Project proposal",), "Achinoam Shoham")
+
+
+def test_streaming_analyze_matches_list():
+    root = os.path.dirname(__file__)
+    subjects = os.path.join(root, 'subjects.txt')
+    deadlines = parse_readme_deadlines(os.path.join(root, 'README.md'))
+    assert analyze(deadlines, iter_subjects(subjects)) == analyze(deadlines, parse_subjects(subjects))
+
+
+def test_submission_row_view():
+    ts = datetime(2026, 1, 3, 18, 44, 38, tzinfo=timezone.utc)
+    row = Submission("213", "OPEN", "Day08 by Shoshana Sernik", ["Day08"], "Shoshana Sernik", ts)
+    assert row["student"] == "Shoshana Sernik"
+    assert row.get("status") == "OPEN"
+    assert row.get("missing", "x") == "x"
+    assert row["timestamp"] == ts
+    assert row.to_dict() == {"id": "213", "status": "OPEN", "title": "Day08 by Shoshana Sernik",
+                             "assignments": ("Day08",), "student": "Shoshana Sernik", "timestamp": ts}
+    assert not hasattr(row, "__dict__")
+
+
+def test_normalize_student_key():
+    assert normalize_student_key("Rachel Steinitz-Eliyahu") == "rachel steinitz eliyahu"
+    assert normalize_student_key("  by  RACHEL Steinitz Eliyahu ") == "rachel steinitz eliyahu"
+    assert normalize_student_key("") == ""
+
+
+def test_student_alias_index_merges_and_persists(tmp_path):
+    aliases = StudentAliasIndex()
+    assert aliases.canonical("Rachel Steinitz Eliyahu") == "Rachel Steinitz Eliyahu"
+    assert aliases.canonical("Rachel Steinitz-Eliyahu") == "Rachel Steinitz Eliyahu"
+    path = tmp_path / "aliases.json"
+    aliases.save(str(path))
+    assert json.loads(path.read_text()) == {"rachel steinitz eliyahu": "Rachel Steinitz Eliyahu"}
+    loaded = StudentAliasIndex.load(str(path))
+    assert loaded.canonical("RACHEL STEINITZ-ELIYAHU") == "Rachel Steinitz Eliyahu"
+    assert StudentAliasIndex.load(str(tmp_path / "missing.json")).aliases == {}
+
+    subjects = os.path.join(os.path.dirname(__file__), 'subjects.txt')
+    students = {r.student for r in iter_subjects(subjects)}
+    assert "Rachel Steinitz-Eliyahu" not in students
+
+
+def test_analyze_incremental_matches_full_run(tmp_path):
+    root = os.path.dirname(__file__)
+    with open(os.path.join(root, 'subjects.txt'), 'rb') as fh:
+        data = fh.read()
+    readme = os.path.join(root, 'README.md')
+    subjects = tmp_path / 'subjects.txt'
+    state = str(tmp_path / 'state.json')
+    expected = analyze(parse_readme_deadlines(readme), iter_subjects(os.path.join(root, 'subjects.txt')))
+
+    # first half, ending in the middle of a line: a one-shot run parses it, like a full run
+    cut = data.index(b'\n', len(data) // 2) + 10
+    subjects.write_bytes(data[:cut])
+    assert analyze_incremental(str(subjects), readme, state) == analyze(
+        parse_readme_deadlines(readme), iter_subjects(str(subjects)))
+    assert json.loads(open(state).read())['subjects']['offset'] == cut
+
+    # the rest of that line arrives, so the cut off row is parsed again in full
+    subjects.write_bytes(data)
+    assert analyze_incremental(str(subjects), readme, state) == expected
+    assert analyze_incremental(str(subjects), readme, state) == expected
+    assert json.loads(open(state).read())['subjects']['offset'] == len(data)
+
+    # a truncated file is analyzed again from the start
+    first_offset = data.rindex(b'\n', 0, cut) + 1
+    subjects.write_bytes(data[:first_offset])
+    partial = analyze_incremental(str(subjects), readme, state)
+    assert partial != expected
+    os.remove(state)
+    assert analyze_incremental(str(subjects), readme, state) == partial
+
+
+def test_analyze_incremental_reparses_changed_readme(tmp_path):
+    root = os.path.dirname(__file__)
+    subjects = os.path.join(root, 'subjects.txt')
+    readme = tmp_path / 'README.md'
+    readme.write_text("Day01 Dead-line: 2025.11.02 22:00\n")
+    state = str(tmp_path / 'state.json')
+    missing, _, _ = analyze_incremental(subjects, str(readme), state)
+    assert all(assigns == ['Day01'] for assigns in missing.values())
+    readme.write_text("Day01 Dead-line: 2025.11.02 22:00\nDay02 Dead-line: 2025.11.09 22:00\n")
+    os.utime(readme, ns=(0, 0))
+    missing, _, _ = analyze_incremental(subjects, str(readme), state)
+    assert any('Day02' in assigns for assigns in missing.values())
+
+
+def test_analyze_columnar_matches_analyze():
+    root = os.path.dirname(__file__)
+    deadlines = parse_readme_deadlines(os.path.join(root, 'README.md'))
+    rows = parse_subjects(os.path.join(root, 'subjects.txt'))
+    assert analyze_columnar(deadlines, rows) == analyze(deadlines, rows)
+    assert analyze_columnar(deadlines, []) == ({}, [], [])
+
+    early = datetime(2025, 11, 1, tzinfo=timezone.utc)
+    late = datetime(2025, 11, 5, tzinfo=timezone.utc)
+    rows = [
+        Submission("1", "OPEN", "", ["Day01", "Day02"], "B", late),
+        Submission("2", "OPEN", "", ["Day01"], "B", early),
+        Submission("3", "OPEN", "", ["Day01", "Day10"], "A", None),
+        Submission("4", "MERGED", "", ["Day02"], "A", late),
+    ]
+    assert analyze_columnar(deadlines, rows) == analyze(deadlines, rows)
+
+
+def test_analyze_courses(tmp_path):
+    root = os.path.dirname(__file__)
+    # a course may be called 'combined' without losing its report
+    for course in ('bio101', 'combined'):
+        (tmp_path / course).mkdir()
+        shutil.copy(os.path.join(root, 'subjects.txt'), tmp_path / course)
+        shutil.copy(os.path.join(root, 'README.md'), tmp_path / course)
+    (tmp_path / 'notes').mkdir()
+    combined = analyze_courses(str(tmp_path), workers=2)
+
+    rows = parse_subjects(os.path.join(root, 'subjects.txt'))
+    report = format_report(*analyze(parse_readme_deadlines(os.path.join(root, 'README.md')), rows))
+    reports = tmp_path / 'reports'
+    assert sorted(p.name for p in reports.iterdir()) == ['combined.txt', 'courses']
+    assert sorted(p.name for p in (reports / 'courses').iterdir()) == ['bio101.txt', 'combined.txt']
+    assert (reports / 'courses' / 'bio101.txt').read_text() == report + '\n'
+    assert (reports / 'courses' / 'combined.txt').read_text() == report + '\n'
+    assert combined.startswith('COMBINED REPORT (2 courses)')
+    assert combined.count(report) == 2
+    assert 'notes' not in combined
+
+
+def test_parse_iso_z_fast_path_and_fallback():
+    utc = datetime(2026, 1, 3, 18, 44, 38, tzinfo=timezone.utc)
+    assert _parse_iso_z("2026-01-03T18:44:38Z") == utc
+    assert _parse_iso_z("2026-01-03T18:44:38Z").utcoffset() == timedelta(0)
+    assert _parse_iso_z(" 2026-01-03T18:44:38Z ") == utc
+    assert _parse_iso_z("2026-01-03T20:44:38+02:00") == utc
+    assert _parse_iso_z("2026-13-03T18:44:38Z") is None
+    assert _parse_iso_z("not a timestamp") is None
+
+
+def test_write_report_formats():
+    root = os.path.dirname(__file__)
+    deadlines = parse_readme_deadlines(os.path.join(root, 'README.md'))
+    missing, late, open_subs = analyze(deadlines, iter_subjects(os.path.join(root, 'subjects.txt')))
+
+    text = io.StringIO()
+    write_report(missing, late, open_subs, 'text', text)
+    assert text.getvalue() == format_report(missing, late, open_subs) + '\n'
+
+    jsonl = io.StringIO()
+    write_report(missing, late, open_subs, 'jsonl', jsonl)
+    records = [json.loads(line) for line in jsonl.getvalue().splitlines()]
+    assert all(tuple(r) == RECORD_FIELDS for r in records)
+    assert sum(r['section'] == 'missing' for r in records) == sum(len(a) for a in missing.values())
+    assert sum(r['section'] == 'late' for r in records) == len(late)
+    assert sum(r['section'] == 'open' for r in records) == sum(len(r.assignments) for r in open_subs)
+    first_late = next(r for r in records if r['section'] == 'late')
+    assert first_late['deadline'] == deadlines[first_late['assignment']].isoformat()
+
+    table = io.StringIO()
+    write_report(missing, late, open_subs, 'csv', table)
+    rows = list(csv.DictReader(io.StringIO(table.getvalue())))
+    assert len(rows) == len(records)
+    assert rows[0] == {k: '' if v is None else v for k, v in records[0].items()}
+
+
+def test_submission_watcher(tmp_path):
+    root = os.path.dirname(__file__)
+    with open(os.path.join(root, 'subjects.txt'), 'rb') as fh:
+        lines = fh.readlines()
+    readme = os.path.join(root, 'README.md')
+    subjects = tmp_path / 'subjects.txt'
+    subjects.write_bytes(b''.join(lines[:50]))
+    watcher = SubmissionWatcher(str(subjects), readme)
+    assert watcher.refresh()
+    assert not watcher.refresh()
+    assert watcher.metrics['rows_parsed'] == 50 and watcher.metrics['updates'] == 1
+
+    with open(subjects, 'ab') as fh:
+        fh.write(b''.join(lines[50:]))
+    updates = []
+    watcher.watch(lambda w: updates.append(w.results()), interval=0.01, max_updates=1)
+    expected = analyze(parse_readme_deadlines(readme), iter_subjects(os.path.join(root, 'subjects.txt')))
+    assert updates == [expected]
+    assert watcher.metrics['rows_parsed'] == len(lines)
+    assert watcher.metrics['readme_parses'] == 1
+    assert watcher.metrics['last_latency_ms'] > 0
+
+    resumed = SubmissionWatcher(str(subjects), readme, state=json.loads(json.dumps(watcher.to_state())))
+    assert not resumed.refresh()
+    assert resumed.results() == expected
+
+
+def test_submission_watcher_survives_missing_files(tmp_path):
+    root = os.path.dirname(__file__)
+    with open(os.path.join(root, 'subjects.txt'), 'rb') as fh:
+        lines = fh.readlines()
+    with open(os.path.join(root, 'README.md'), 'rb') as fh:
+        readme_text = fh.read()
+    readme = tmp_path / 'README.md'
+    readme.write_bytes(readme_text)
+    subjects = tmp_path / 'subjects.txt'
+    subjects.write_bytes(b''.join(lines[:50]))
+    watcher = SubmissionWatcher(str(subjects), str(readme))
+    assert watcher.refresh()
+
+    readme.unlink()
+    assert not watcher.refresh()
+    readme.write_bytes(readme_text)
+    subjects.unlink()
+    assert not watcher.refresh()
+    assert watcher.metrics['file_errors'] == 2
+    subjects.write_bytes(b''.join(lines))
+    updates = []
+    watcher.watch(lambda w: updates.append(w.results()), interval=0.01, max_updates=1)
+    assert updates == [analyze(parse_readme_deadlines(str(readme)), iter_subjects(str(subjects)))]
+
+
+def test_submission_watcher_parses_stable_tail_line(tmp_path):
+    root = os.path.dirname(__file__)
+    with open(os.path.join(root, 'subjects.txt'), 'rb') as fh:
+        lines = fh.readlines()
+    readme = os.path.join(root, 'README.md')
+    subjects = tmp_path / 'subjects.txt'
+    subjects.write_bytes(b''.join(lines[:49]) + lines[49].rstrip(b'\r\n'))
+    watcher = SubmissionWatcher(str(subjects), readme)
+    assert watcher.refresh()
+    assert watcher.metrics['rows_parsed'] == 49
+    # the size did not change since the last refresh, so the last line is complete
+    assert watcher.refresh()
+    assert watcher.metrics['rows_parsed'] == 50
+    assert not watcher.refresh()
+
+    # its newline and more rows are appended: nothing is parsed twice
+    with open(subjects, 'ab') as fh:
+        fh.write(b'\n' + b''.join(lines[50:]))
+    assert watcher.refresh()
+    assert watcher.results() == analyze(parse_readme_deadlines(readme), iter_subjects(str(subjects)))
+
+    # the last line was cut off after all: the file is parsed again from the start
+    subjects.write_bytes(b''.join(lines[:49]) + lines[49][:5])
+    watcher = SubmissionWatcher(str(subjects), readme)
+    watcher.refresh(tail=True)
+    with open(subjects, 'ab') as fh:
+        fh.write(lines[49][5:])
+    assert watcher.refresh()
+    assert watcher.results() == analyze(parse_readme_deadlines(readme), iter_subjects(str(subjects)))
+
+
+def test_submission_watcher_keeps_deadlines_of_emptied_readme(tmp_path):
+    root = os.path.dirname(__file__)
+    readme = tmp_path / 'README.md'
+    readme.write_bytes(open(os.path.join(root, 'README.md'), 'rb').read())
+    subjects = os.path.join(root, 'subjects.txt')
+    watcher = SubmissionWatcher(subjects, str(readme))
+    assert watcher.refresh()
+    expected = watcher.results()
+
+    readme.write_text("")
+    assert not watcher.refresh()
+    assert watcher.metrics['file_errors'] == 1
+    assert watcher.results() == expected
+    with pytest.raises(ValueError):
+        watcher.refresh(strict=True)
+
+
+def test_main_watch_resumes_and_saves_state(tmp_path, monkeypatch):
+    root = os.path.dirname(__file__)
+    subjects = os.path.join(root, 'subjects.txt')
+    readme = os.path.join(root, 'README.md')
+    state = str(tmp_path / 'state.json')
+    output = str(tmp_path / 'report.txt')
+    watch = SubmissionWatcher.watch
+    monkeypatch.setattr(SubmissionWatcher, 'watch',
+                        lambda self, on_update, interval: watch(self, on_update, interval, max_updates=1))
+    assert main([subjects, readme, '--watch', '--state', state, '--output', output]) == 0
+    assert json.loads(open(state).read())['subjects']['offset'] == os.path.getsize(subjects)
+
+    seen = []
+    monkeypatch.setattr(SubmissionWatcher, 'watch', lambda self, on_update, interval: seen.append(self.subjects))
+    main([subjects, readme, '--watch', '--state', state, '--output', output])
+    assert seen[0]['offset'] == os.path.getsize(subjects)